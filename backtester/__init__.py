@@ -6,12 +6,28 @@
 - 回测引擎
 - 性能指标计算
 - 配置管理
+
+数据管理和回测引擎依赖 pandas/numpy，按需延迟导入，
+仅使用配置管理时不会加载这些重量级依赖。
 """
 
-from .data_manager import DataManager, load_stock_data
-from .engine import BacktestEngine, load_strategy, list_strategies, run_backtest
+import importlib
+
 from .config_manager import ConfigManager, save_strategy_config, load_strategy_config, list_strategy_configs
 
+# 延迟导入的名称 -> 所在子模块
+_LAZY_IMPORTS = {
+    'DataManager': '.data_manager',
+    'load_stock_data': '.data_manager',
+    'BacktestEngine': '.engine',
+    'load_strategy': '.engine',
+    'list_strategies': '.engine',
+    'run_backtest': '.engine',
+    'run_backtests': '.engine',
+    'run_param_sweep': '.engine',
+    'save_results': '.engine',
+}
+
 __all__ = [
     'DataManager',
     'load_stock_data',
@@ -19,9 +35,27 @@ __all__ = [
     'load_strategy',
     'list_strategies',
     'run_backtest',
+    'run_backtests',
+    'run_param_sweep',
+    'save_results',
     'ConfigManager',
     'save_strategy_config',
     'load_strategy_config',
     'list_strategy_configs'
 ]
 __version__ = '1.0.0'
+
+
+def __getattr__(name):
+    """首次访问时才导入数据管理/回测引擎模块"""
+    module_name = _LAZY_IMPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_IMPORTS))
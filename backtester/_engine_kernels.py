@@ -0,0 +1,142 @@
+"""
+回测引擎编译内核
+
+把纯数值策略的逐K线循环整体编译为机器码（Numba），
+用于参数扫描等需要反复运行同一策略的场景。
+
+策略通过类属性 numba_kernel 声明内核名称，并实现 get_kernel_args()
+返回内核所需的标量参数；未安装 numba 时引擎回退到逐K线的Python路径。
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """未安装numba时的空装饰器"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+# 交易方向编码
+SIDE_BUY = 0
+SIDE_SELL = 1
+
+
+@njit(cache=True)
+def _roll_sum(closes, i, period, total):
+    """滚动窗口和：先移出窗口外的价格再加入新价格（与策略的deque实现运算顺序一致）"""
+    if i >= period:
+        total -= closes[i - period]
+    return total + closes[i]
+
+
+@njit(cache=True)
+def _next_ma(closes, i, period, window_sum, prev_ma, multiplier, use_ema):
+    """计算第i根K线的均线值，数据不足时返回NaN"""
+    if i + 1 < period:
+        return np.nan
+    if use_ema and not np.isnan(prev_ma):
+        return (closes[i] - prev_ma) * multiplier + prev_ma
+    # SMA，或EMA的首个值（以SMA作为初始值）
+    return window_sum / period
+
+
+@njit(cache=True)
+def run_ma_cross(closes, initial_capital, fast_period, slow_period, use_ema):
+    """
+    金叉死叉策略的完整回测循环
+
+    逻辑与 MACrossStrategy + BacktestEngine 的Python路径逐K线一致：
+    金叉时用95%现金买入，死叉时全部卖出。
+
+    Args:
+        closes: 收盘价数组 (float64)
+        initial_capital: 初始资金
+        fast_period: 快速均线周期
+        slow_period: 慢速均线周期
+        use_ema: True 使用EMA，False 使用SMA
+
+    Returns:
+        (trade_idx, trade_side, trade_price, trade_size,
+         equity, cash, position_value, fast_ma, slow_ma)
+        交易数组已裁剪为实际交易数量；权益相关数组与 closes 等长
+    """
+    n = closes.shape[0]
+
+    # 交易缓冲区按最大可能数量预分配，最后裁剪
+    trade_idx = np.empty(n, dtype=np.int64)
+    trade_side = np.empty(n, dtype=np.int8)
+    trade_price = np.empty(n, dtype=np.float64)
+    trade_size = np.empty(n, dtype=np.float64)
+    n_trades = 0
+
+    equity = np.empty(n, dtype=np.float64)
+    cash_arr = np.empty(n, dtype=np.float64)
+    position_value = np.empty(n, dtype=np.float64)
+
+    fast_multiplier = 2.0 / (fast_period + 1)
+    slow_multiplier = 2.0 / (slow_period + 1)
+
+    cash = initial_capital
+    position = 0.0
+    fast_ma = np.nan
+    slow_ma = np.nan
+    fast_sum = 0.0
+    slow_sum = 0.0
+
+    for i in range(n):
+        price = closes[i]
+
+        fast_sum = _roll_sum(closes, i, fast_period, fast_sum)
+        slow_sum = _roll_sum(closes, i, slow_period, slow_sum)
+        
+        prev_fast_ma = fast_ma
+        prev_slow_ma = slow_ma
+        fast_ma = _next_ma(closes, i, fast_period, fast_sum, prev_fast_ma, fast_multiplier, use_ema)
+        slow_ma = _next_ma(closes, i, slow_period, slow_sum, prev_slow_ma, slow_multiplier, use_ema)
+
+        ready = not (np.isnan(fast_ma) or np.isnan(slow_ma) or
+                     np.isnan(prev_fast_ma) or np.isnan(prev_slow_ma))
+
+        if position <= 0 and ready and prev_fast_ma <= prev_slow_ma and fast_ma > slow_ma:
+            # 金叉买入
+            size = (cash * 0.95) / price
+            cost = price * size
+            if cost <= cash:
+                position = size
+                cash -= cost
+                trade_idx[n_trades] = i
+                trade_side[n_trades] = SIDE_BUY
+                trade_price[n_trades] = price
+                trade_size[n_trades] = size
+                n_trades += 1
+        elif position > 0 and ready and prev_fast_ma >= prev_slow_ma and fast_ma < slow_ma:
+            # 死叉卖出
+            size = position
+            cash += price * size
+            position = 0.0
+            trade_idx[n_trades] = i
+            trade_side[n_trades] = SIDE_SELL
+            trade_price[n_trades] = price
+            trade_size[n_trades] = size
+            n_trades += 1
+
+        position_value[i] = position * price
+        cash_arr[i] = cash
+        equity[i] = cash + position_value[i]
+
+    return (trade_idx[:n_trades], trade_side[:n_trades],
+            trade_price[:n_trades], trade_size[:n_trades],
+            equity, cash_arr, position_value, fast_ma, slow_ma)
+
+
+# 内核名称 -> 内核函数
+KERNELS = {
+    'ma_cross': run_ma_cross,
+}
@@ -7,17 +7,66 @@
 
 import os
 import json
+import sqlite3
+import threading
 from datetime import datetime
 from typing import Dict, Any, List, Optional
 from pathlib import Path
 import uuid
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _json_loads(data) -> Any:
+    """解析JSON（优先使用orjson，未安装时回退到标准库）"""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def _json_dumps(obj: Any) -> bytes:
+    """序列化为带缩进的UTF-8 JSON字节串"""
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+
 
 class ConfigManager:
     """
     配置管理器
     
     管理策略参数配置的持久化存储。
+    所有配置保存在配置目录下的一个SQLite数据库中，按 (strategy, symbol) 建立索引，
+    列表查询只读取匹配的行。
+    """
+    
+    # 数据库文件名
+    DB_FILENAME = 'configs.db'
+    
+    # 旧版JSON存储的索引文件名（迁移后删除）
+    LEGACY_INDEX_FILENAME = '_index.json'
+    
+    # 配置字段（与返回的配置字典键顺序一致）
+    COLUMNS = ('id', 'name', 'strategy', 'symbol', 'params', 'description', 'created_at', 'updated_at')
+    
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS configs (
+            id TEXT PRIMARY KEY,
+            name TEXT,
+            strategy TEXT NOT NULL,
+            symbol TEXT,
+            params TEXT NOT NULL,
+            description TEXT,
+            created_at TEXT,
+            updated_at TEXT
+        );
+        CREATE INDEX IF NOT EXISTS ix_strategy_symbol ON configs(strategy, symbol, updated_at);
+        CREATE INDEX IF NOT EXISTS ix_symbol ON configs(symbol, updated_at);
+        CREATE INDEX IF NOT EXISTS ix_updated_at ON configs(updated_at);
     """
     
     def __init__(self, config_dir: Optional[str] = None):
@@ -33,14 +82,78 @@ class ConfigManager:
         
         self.config_dir = Path(config_dir)
         self.config_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.config_dir / self.DB_FILENAME
+        
+        # 同一实例可能被Web服务的多个线程共享，连接访问用锁串行化
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute("PRAGMA cache_size=-65536")  # 64MB页缓存
+            self._conn.executescript(self.SCHEMA)
+        
+        # 将旧的JSON配置文件一次性导入数据库
+        self._migrate_json_files()
+    
+    def data_version(self) -> int:
+        """
+        数据库版本号
+        
+        其他连接（如Web服务的其他worker进程）提交修改后改变，
+        用于让进程内的配置列表缓存失效。
+        """
+        with self._lock:
+            return self._conn.execute("PRAGMA data_version").fetchone()[0]
     
     def _generate_id(self) -> str:
         """生成唯一配置ID"""
         return str(uuid.uuid4())[:8]
     
-    def _get_config_path(self, config_id: str) -> Path:
-        """获取配置文件路径"""
-        return self.config_dir / f"{config_id}.json"
+    def _row_to_config(self, row: sqlite3.Row) -> Dict[str, Any]:
+        """数据库行转换为配置字典"""
+        config = dict(zip(self.COLUMNS, row))
+        config['params'] = _json_loads(config['params'])
+        return config
+    
+    def _write(self, config: Dict[str, Any]) -> None:
+        """插入或更新一条配置"""
+        values = [config.get(col) for col in self.COLUMNS]
+        values[self.COLUMNS.index('params')] = _json_dumps(config.get('params') or {}).decode('utf-8')
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO configs ({', '.join(self.COLUMNS)}) "
+                f"VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                values
+            )
+    
+    def _migrate_json_files(self) -> None:
+        """把旧版目录中的 <id>.json 配置导入数据库并删除原文件"""
+        with os.scandir(self.config_dir) as it:
+            json_names = [entry.name for entry in it
+                          if entry.name.endswith('.json') and entry.is_file(follow_symlinks=False)]
+        
+        for filename in json_names:
+            path = self.config_dir / filename
+            if filename == self.LEGACY_INDEX_FILENAME:
+                path.unlink(missing_ok=True)
+                continue
+            
+            try:
+                config = _json_loads(path.read_bytes())
+                if 'strategy' not in config or 'params' not in config:
+                    continue
+                config.setdefault('id', filename[:-5])
+                self._write(config)
+                path.unlink()
+            except Exception as e:
+                print(f"警告: 迁移配置 {filename} 失败: {e}")
+    
+    def close(self) -> None:
+        """关闭数据库连接"""
+        with self._lock:
+            self._conn.close()
     
     def save_config(self, 
                     strategy: str,
@@ -91,10 +204,7 @@ class ConfigManager:
             'updated_at': now
         }
         
-        # 保存到文件
-        config_path = self._get_config_path(config_id)
-        with open(config_path, 'w', encoding='utf-8') as f:
-            json.dump(config, f, indent=2, ensure_ascii=False)
+        self._write(config)
         
         return config
     
@@ -108,16 +218,11 @@ class ConfigManager:
         Returns:
             配置字典，不存在则返回None
         """
-        config_path = self._get_config_path(config_id)
-        
-        if not config_path.exists():
-            return None
-        
-        try:
-            with open(config_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
-        except Exception:
-            return None
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM configs WHERE id = ?", (config_id,)
+            ).fetchone()
+        return self._row_to_config(row) if row is not None else None
     
     def delete_config(self, config_id: str) -> bool:
         """
@@ -129,12 +234,35 @@ class ConfigManager:
         Returns:
             是否删除成功
         """
-        config_path = self._get_config_path(config_id)
+        with self._lock, self._conn:
+            cursor = self._conn.execute("DELETE FROM configs WHERE id = ?", (config_id,))
+        return cursor.rowcount > 0
+    
+    def _query_configs(self,
+                       strategy: Optional[str] = None,
+                       symbol: Optional[str] = None,
+                       limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """按策略/股票筛选配置（走索引），按更新时间排序（最新的在前）"""
+        conditions = []
+        args: List[Any] = []
+        if strategy:
+            conditions.append("strategy = ?")
+            args.append(strategy)
+        if symbol:
+            conditions.append("symbol = ?")
+            args.append(symbol)
+        
+        sql = f"SELECT {', '.join(self.COLUMNS)} FROM configs"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY updated_at DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
         
-        if config_path.exists():
-            config_path.unlink()
-            return True
-        return False
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [self._row_to_config(row) for row in rows]
     
     def list_configs(self, 
                      strategy: Optional[str] = None,
@@ -149,27 +277,7 @@ class ConfigManager:
         Returns:
             配置列表
         """
-        configs = []
-        
-        for config_file in self.config_dir.glob('*.json'):
-            try:
-                with open(config_file, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    
-                    # 筛选
-                    if strategy and config.get('strategy') != strategy:
-                        continue
-                    if symbol and config.get('symbol') != symbol:
-                        continue
-                    
-                    configs.append(config)
-            except Exception:
-                continue
-        
-        # 按更新时间排序（最新的在前）
-        configs.sort(key=lambda x: x.get('updated_at', ''), reverse=True)
-        
-        return configs
+        return self._query_configs(strategy, symbol)
     
     def get_configs_by_strategy(self, strategy: str) -> List[Dict[str, Any]]:
         """获取指定策略的所有配置"""
@@ -216,9 +324,9 @@ class ConfigManager:
             JSON字符串
         """
         config = self.get_config(config_id)
-        if config:
-            return json.dumps(config, indent=2, ensure_ascii=False)
-        return None
+        if config is None:
+            return None
+        return _json_dumps(config).decode('utf-8')
     
     def import_config(self, json_str: str) -> Optional[Dict[str, Any]]:
         """
@@ -231,7 +339,7 @@ class ConfigManager:
             导入的配置信息
         """
         try:
-            data = json.loads(json_str)
+            data = _json_loads(json_str)
             
             # 验证必要字段
             if 'strategy' not in data or 'params' not in data:
@@ -259,7 +367,7 @@ class ConfigManager:
         Returns:
             最新的配置
         """
-        configs = self.list_configs(strategy=strategy, symbol=symbol)
+        configs = self._query_configs(strategy, symbol, limit=1)
         return configs[0] if configs else None
 
 
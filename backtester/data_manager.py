@@ -2,14 +2,88 @@
 数据管理模块
 
 负责数据加载、下载、预处理和缓存。
-支持本地CSV文件和yfinance在线数据。
+支持本地Parquet/CSV文件和yfinance在线数据。
+安装了 pyarrow 时使用 Parquet 列式存储，否则回退到CSV。
 """
 
 import os
+import json
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Iterator
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pacsv
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+# 本地数据文件后缀（按优先级排列）
+DATA_SUFFIXES = ('.parquet', '.csv')
+
+# OHLCV数据列
+OHLCV_COLUMNS = ['open', 'high', 'low', 'close', 'volume']
+
+class DownloadError(Exception):
+    """从yfinance下载数据失败（网络错误、股票代码无效等）"""
+
+
+class NoDataError(ValueError):
+    """指定时间范围内没有数据"""
+
+
+# pandas 3.0 起写时复制始终启用，不能也无需再设置
+PANDAS_ALWAYS_COW = int(pd.__version__.split('.')[0]) >= 3
+
+
+def enable_copy_on_write() -> None:
+    """
+    启用pandas写时复制（由入口程序调用，会改变整个进程的pandas语义）
+    
+    启用后 DataManager.get_data 直接返回缓存切片，不再复制。
+    """
+    if not PANDAS_ALWAYS_COW:
+        pd.set_option('mode.copy_on_write', True)
+
+
+def copy_on_write_enabled() -> bool:
+    """当前进程是否启用了写时复制"""
+    return PANDAS_ALWAYS_COW or pd.options.mode.copy_on_write is True
+
+
+# 本地数据清单文件（记录每个数据文件的日期范围、记录数等）
+MANIFEST_FILENAME = '_manifest.json'
+
+# HTTP连接池大小（yf.download 多线程下载时每个线程占用一个连接）
+HTTP_POOL_SIZE = 50
+
+
+def create_http_session():
+    """
+    创建复用连接的HTTP会话，供所有yfinance请求共享
+    
+    新版yfinance要求使用 curl_cffi 会话（随其一同安装）；
+    旧版yfinance使用 requests 会话，挂载足够大的连接池以免多线程下载时连接被丢弃。
+    """
+    try:
+        from curl_cffi import requests as curl_requests
+        return curl_requests.Session(impersonate='chrome')
+    except ImportError:
+        pass
+    
+    import requests
+    from requests.adapters import HTTPAdapter
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=HTTP_POOL_SIZE, pool_maxsize=HTTP_POOL_SIZE)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
 
 class DataManager:
     """
@@ -22,20 +96,135 @@ class DataManager:
     # 默认热门股票列表
     DEFAULT_SYMBOLS = ['AAPL', 'TSLA', 'GOOGL', 'MSFT', 'AMZN', 'META', 'NVDA', 'SPY', 'QQQ']
     
-    def __init__(self, data_dir: Optional[str] = None):
+    def __init__(self, data_dir: Optional[str] = None, session: Any = None):
         """
         初始化数据管理器
         
         Args:
             data_dir: 数据目录路径，默认为 backtester/data
+            session: 下载数据使用的HTTP会话，默认在首次下载时创建
         """
         if data_dir is None:
             data_dir = os.path.join(os.path.dirname(__file__), 'data')
         self.data_dir = data_dir
+        self._session = session
+        # 内存缓存: 股票代码 -> 按日期排序的完整历史数据
         self._cache: Dict[str, pd.DataFrame] = {}
+        # 缓存数据对应的本地文件修改时间，文件被其他进程更新或删除后缓存失效
+        self._cache_versions: Dict[str, Optional[int]] = {}
+        
+        # 本地数据清单（延迟加载）: 股票代码 -> 数据摘要
+        self._manifest_path = os.path.join(self.data_dir, MANIFEST_FILENAME)
+        self._manifest: Optional[Dict[str, Dict[str, Any]]] = None
+        # 多个线程会同时下载/列出数据，清单的读取、修改和写入都需持有此锁
+        self._manifest_lock = threading.Lock()
+        
+        # yfinance Ticker 对象缓存（复用其HTTP会话和已获取的元数据）
+        self._tickers: Dict[str, Any] = {}
+        
+        # 后台预加载: 股票代码 -> 正在加载本地数据的Future
+        self._prefetch_pool: Optional[ThreadPoolExecutor] = None
+        self._pending: Dict[str, Future] = {}
         
         # 确保数据目录存在
         os.makedirs(self.data_dir, exist_ok=True)
+        
+        # 将旧的CSV数据一次性迁移为Parquet
+        if HAS_PYARROW:
+            self._migrate_csv_to_parquet()
+    
+    @property
+    def session(self) -> Any:
+        """下载使用的HTTP会话（保持长连接，避免每次下载重新建立TCP/TLS连接）"""
+        if self._session is None:
+            self._session = create_http_session()
+        return self._session
+    
+    def _data_path(self, symbol: str, suffix: str) -> str:
+        """获取数据文件路径（symbol 需已转为大写）"""
+        return os.path.join(self.data_dir, f"{symbol}{suffix}")
+    
+    def local_version(self, symbol: str) -> Optional[int]:
+        """
+        本地数据文件的修改时间（纳秒），没有本地数据时返回None
+        
+        多个进程共享数据目录时，用于发现其他进程重新下载或删除了该股票数据。
+        """
+        symbol = symbol.upper()
+        for suffix in DATA_SUFFIXES:
+            try:
+                return os.stat(self._data_path(symbol, suffix)).st_mtime_ns
+            except FileNotFoundError:
+                continue
+        return None
+    
+    def data_dir_version(self) -> int:
+        """数据目录的修改时间（纳秒），增删数据文件或更新清单时改变"""
+        return os.stat(self.data_dir).st_mtime_ns
+    
+    @staticmethod
+    def _symbol_from_filename(filename: str) -> Optional[str]:
+        """从数据文件名解析股票代码，不是数据文件时返回None"""
+        for suffix in DATA_SUFFIXES:
+            if filename.endswith(suffix):
+                return filename[:-len(suffix)].upper()
+        return None
+    
+    def _get_manifest(self) -> Dict[str, Dict[str, Any]]:
+        """获取数据清单（首次访问时从文件读取，调用方需持有 _manifest_lock）"""
+        if self._manifest is None:
+            try:
+                with open(self._manifest_path, 'r', encoding='utf-8') as f:
+                    self._manifest = json.load(f)
+            except (OSError, ValueError):
+                self._manifest = {}
+        return self._manifest
+    
+    def _write_manifest(self) -> None:
+        """原子写入数据清单文件（调用方需持有 _manifest_lock）"""
+        fd, tmp_path = tempfile.mkstemp(dir=self.data_dir, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(self._manifest, f, indent=2, ensure_ascii=False)
+            os.replace(tmp_path, self._manifest_path)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    
+    def _write_parquet(self, df: pd.DataFrame, filepath: str) -> None:
+        """
+        原子写入Parquet文件
+        
+        先写入数据目录中的临时文件再替换，写入中途崩溃不会留下不完整的Parquet文件。
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.data_dir, suffix='.parquet.tmp')
+        os.close(fd)
+        try:
+            df.to_parquet(tmp_path, engine='pyarrow', compression='zstd')
+            os.replace(tmp_path, filepath)
+        except BaseException:
+            os.remove(tmp_path)
+            raise
+    
+    def _migrate_csv_to_parquet(self) -> None:
+        """把没有对应Parquet文件的CSV数据转换为Parquet并删除CSV"""
+        with os.scandir(self.data_dir) as it:
+            csv_names = [entry.name for entry in it if entry.name.endswith('.csv')]
+        
+        for filename in csv_names:
+            symbol = filename[:-4].upper()
+            if os.path.exists(self._data_path(symbol, '.parquet')):
+                continue
+            
+            df = self.load_csv(symbol)
+            if df is None:
+                continue
+            
+            try:
+                self._write_parquet(df, self._data_path(symbol, '.parquet'))
+                os.remove(os.path.join(self.data_dir, filename))
+            except Exception as e:
+                print(f"警告: 迁移 {filename} 到Parquet失败: {e}")
     
     def download_from_yfinance(self, symbol: str, start: str, end: str, 
                                 interval: str = '1d') -> pd.DataFrame:
@@ -59,29 +248,98 @@ class DataManager:
         print(f"正在从 yfinance 下载 {symbol} 数据...")
         print(f"  时间范围: {start} 到 {end}")
         
-        ticker = yf.Ticker(symbol)
-        df = ticker.history(start=start, end=end, interval=interval)
+        ticker = self._tickers.get(symbol)
+        if ticker is None:
+            ticker = self._tickers[symbol] = yf.Ticker(symbol, session=self.session)
+        try:
+            df = ticker.history(start=start, end=end, interval=interval)
+        except Exception as e:
+            # yfinance/网络异常类型各不相同，统一转换为下载失败
+            raise DownloadError(f"下载 {symbol} 数据失败: {e}") from e
         
         if df.empty:
-            raise ValueError(f"无法获取 {symbol} 的数据，请检查股票代码是否正确")
+            raise DownloadError(f"无法获取 {symbol} 的数据，请检查股票代码是否正确")
+        
+        df = self._normalize_ohlcv(df)
+        
+        print(f"  下载完成: {len(df)} 条数据")
+        return df
+    
+    def download_many(self, symbols: List[str], start: str, end: str,
+                      interval: str = '1d') -> Dict[str, pd.DataFrame]:
+        """
+        从yfinance批量下载多只股票的数据
+        
+        通过一次 yf.download 调用并发下载，避免逐个请求。
+        
+        Args:
+            symbols: 股票代码列表
+            start: 开始日期 (YYYY-MM-DD)
+            end: 结束日期 (YYYY-MM-DD)
+            interval: 数据周期 ('1d', '1h', '5m' 等)
+        
+        Returns:
+            股票代码 -> OHLCV数据；下载失败或无数据的股票不包含在内
+        """
+        try:
+            import yfinance as yf
+        except ImportError:
+            raise ImportError("请安装 yfinance: pip install yfinance")
         
+        symbols = [s.upper() for s in symbols]
+        print(f"正在从 yfinance 批量下载 {len(symbols)} 只股票数据...")
+        print(f"  时间范围: {start} 到 {end}")
+        
+        try:
+            raw = yf.download(
+                tickers=' '.join(symbols),
+                start=start,
+                end=end,
+                interval=interval,
+                group_by='ticker',
+                auto_adjust=True,
+                threads=True,
+                progress=False,
+                session=self.session
+            )
+        except Exception as e:
+            raise DownloadError(f"批量下载数据失败: {e}") from e
+        
+        result = {}
+        for symbol in symbols:
+            if isinstance(raw.columns, pd.MultiIndex):
+                if symbol not in raw.columns.get_level_values(0):
+                    continue
+                df = raw[symbol]
+            else:
+                df = raw
+            
+            # 多只股票合并下载时，缺失的交易日会以NaN填充
+            df = df.dropna(how='all')
+            if df.empty:
+                continue
+            result[symbol] = self._normalize_ohlcv(df)
+        
+        print(f"  下载完成: {len(result)}/{len(symbols)} 只股票")
+        return result
+    
+    @staticmethod
+    def _normalize_ohlcv(df: pd.DataFrame) -> pd.DataFrame:
+        """标准化yfinance返回的数据：小写列名、只保留OHLCV列、索引命名为date"""
         # 标准化列名为小写
         df.columns = df.columns.str.lower()
         
         # 只保留需要的列
-        required_cols = ['open', 'high', 'low', 'close', 'volume']
-        available_cols = [col for col in required_cols if col in df.columns]
+        available_cols = [col for col in OHLCV_COLUMNS if col in df.columns]
         df = df[available_cols]
         
         # 确保索引是日期类型，并重命名
         df.index.name = 'date'
-        
-        print(f"  下载完成: {len(df)} 条数据")
         return df
     
     def save_data(self, df: pd.DataFrame, symbol: str) -> str:
         """
-        保存数据到CSV（标准格式）
+        保存数据到本地（有pyarrow时为Parquet，否则为CSV）
         
         Args:
             df: 数据DataFrame
@@ -90,11 +348,61 @@ class DataManager:
         Returns:
             保存的文件路径
         """
-        filepath = os.path.join(self.data_dir, f"{symbol.upper()}.csv")
-        df.to_csv(filepath)
+        symbol = symbol.upper()
+        
+        if HAS_PYARROW:
+            filepath = self._data_path(symbol, '.parquet')
+            self._write_parquet(df, filepath)
+            
+            # 删除可能残留的旧CSV文件
+            csv_path = self._data_path(symbol, '.csv')
+            if os.path.exists(csv_path):
+                os.remove(csv_path)
+        else:
+            filepath = self._data_path(symbol, '.csv')
+            df.to_csv(filepath)
+        
+        # 更新数据清单
+        st = os.stat(filepath)
+        with self._manifest_lock:
+            self._get_manifest()[symbol] = {
+                'symbol': symbol,
+                'start_date': df.index.min().strftime('%Y-%m-%d'),
+                'end_date': df.index.max().strftime('%Y-%m-%d'),
+                'records': len(df),
+                'file_size': st.st_size,
+                'file': os.path.basename(filepath),
+                'mtime_ns': st.st_mtime_ns
+            }
+            self._write_manifest()
+        
         print(f"  数据已保存: {filepath}")
         return filepath
     
+    def load_local(self, symbol: str) -> Optional[pd.DataFrame]:
+        """
+        从本地文件加载数据（优先Parquet，其次CSV）
+        
+        Args:
+            symbol: 股票代码
+        
+        Returns:
+            DataFrame格式的OHLCV数据，如果文件不存在返回None
+        """
+        symbol = symbol.upper()
+        filepath = self._data_path(symbol, '.parquet')
+        
+        if not (HAS_PYARROW and os.path.exists(filepath)):
+            return self.load_csv(symbol)
+        
+        try:
+            # 内存映射读取，页缓存即工作集，避免先拷贝到Python缓冲区
+            table = pq.read_table(filepath, memory_map=True)
+            return table.to_pandas(self_destruct=True)
+        except Exception as e:
+            print(f"警告: 加载 {filepath} 失败: {e}")
+            return None
+    
     def load_csv(self, symbol: str) -> Optional[pd.DataFrame]:
         """
         从本地CSV文件加载数据
@@ -105,17 +413,23 @@ class DataManager:
         Returns:
             DataFrame格式的OHLCV数据，如果文件不存在返回None
         """
-        filepath = os.path.join(self.data_dir, f"{symbol.upper()}.csv")
+        filepath = self._data_path(symbol.upper(), '.csv')
         
         if not os.path.exists(filepath):
             return None
         
         try:
+            if HAS_PYARROW:
+                try:
+                    return self._read_csv_arrow(filepath)
+                except pa.ArrowInvalid:
+                    pass  # 含无法解析的数值，回退到pandas逐列转换
+            
             df = pd.read_csv(filepath, index_col=0, parse_dates=True)
             df.columns = df.columns.str.lower()
             
             # 确保数据类型正确
-            for col in ['open', 'high', 'low', 'close', 'volume']:
+            for col in OHLCV_COLUMNS:
                 if col in df.columns:
                     df[col] = pd.to_numeric(df[col], errors='coerce')
             
@@ -127,6 +441,81 @@ class DataManager:
             print(f"警告: 加载 {filepath} 失败: {e}")
             return None
     
+    @staticmethod
+    def _read_csv_arrow(filepath: str) -> pd.DataFrame:
+        """
+        使用pyarrow的C++解析器读取CSV
+        
+        OHLCV列直接按float64解析，无需再逐列 to_numeric；
+        遇到无法解析的数值时抛出 pa.ArrowInvalid。
+        """
+        column_types = {
+            name: pa.float64()
+            for col in OHLCV_COLUMNS
+            for name in (col, col.capitalize())
+        }
+        with pa.memory_map(filepath, 'r') as source:
+            table = pacsv.read_csv(
+                source,
+                convert_options=pacsv.ConvertOptions(
+                    column_types=column_types,
+                    strings_can_be_null=True
+                )
+            )
+        # 删除无效数据（在Arrow中一次完成，无需pandas再做dropna）
+        table = table.drop_null()
+        df = table.to_pandas(self_destruct=True)
+        
+        # 第一列为日期索引
+        index_col = df.columns[0]
+        df.index = pd.DatetimeIndex(df.pop(index_col), name=index_col)
+        df.columns = df.columns.str.lower()
+        return df
+    
+    def _load_sorted(self, symbol: str) -> Optional[pd.DataFrame]:
+        """加载本地数据并确保按日期排序"""
+        df = self.load_local(symbol)
+        if df is not None and not df.index.is_monotonic_increasing:
+            df = df.sort_index()
+        return df
+    
+    def prefetch(self, symbols: List[str]) -> None:
+        """
+        在后台线程中预加载本地数据
+        
+        适用于依次回测多只股票的场景：处理当前股票时，
+        后续股票的文件读取和解析在后台完成，get_data时直接取用。
+        
+        Args:
+            symbols: 需要预加载的股票代码列表
+        """
+        if self._prefetch_pool is None:
+            self._prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='dm-prefetch')
+        
+        for symbol in symbols:
+            symbol = symbol.upper()
+            if symbol in self._cache or symbol in self._pending:
+                continue
+            self._pending[symbol] = self._prefetch_pool.submit(self._load_sorted, symbol)
+    
+    @staticmethod
+    def _default_range(start: Optional[str], end: Optional[str]):
+        """补全默认日期范围（默认最近2年）"""
+        if end is None:
+            end = datetime.now().strftime('%Y-%m-%d')
+        if start is None:
+            start = (datetime.now() - timedelta(days=365*2)).strftime('%Y-%m-%d')  # 默认2年
+        return start, end
+    
+    @staticmethod
+    def _range_timestamps(df: pd.DataFrame, start: str, end: str):
+        """把日期字符串转换为与数据索引时区一致的Timestamp"""
+        start_ts, end_ts = pd.Timestamp(start), pd.Timestamp(end)
+        tz = getattr(df.index, 'tz', None)
+        if tz is not None:
+            start_ts, end_ts = start_ts.tz_localize(tz), end_ts.tz_localize(tz)
+        return start_ts, end_ts
+    
     def get_data(self, symbol: str, start: Optional[str] = None, 
                  end: Optional[str] = None, force_download: bool = False) -> pd.DataFrame:
         """
@@ -143,35 +532,41 @@ class DataManager:
             force_download: 强制重新下载
         
         Returns:
-            DataFrame格式的OHLCV数据
+            DataFrame格式的OHLCV数据。
+            每只股票只缓存一份按日期排序的完整历史；启用写时复制
+            （enable_copy_on_write()，由入口程序调用）时
+            直接返回其切片，否则返回副本。两种情况下调用方的修改都不会影响缓存。
         """
         symbol = symbol.upper()
-        
-        # 设置默认日期范围
-        if end is None:
-            end = datetime.now().strftime('%Y-%m-%d')
-        if start is None:
-            start = (datetime.now() - timedelta(days=365*2)).strftime('%Y-%m-%d')  # 默认2年
-        
-        # 缓存key
-        cache_key = f"{symbol}_{start}_{end}"
-        if cache_key in self._cache and not force_download:
-            return self._cache[cache_key].copy()
+        start, end = self._default_range(start, end)
         
         df = None
         need_download = force_download
         
-        # 尝试从本地加载
+        # 优先使用内存中的完整历史，其次从本地文件加载
         if not force_download:
-            df = self.load_csv(symbol)
+            version = self.local_version(symbol)
+            df = self._cache.get(symbol)
+            if df is not None and self._cache_versions.get(symbol) != version:
+                # 数据文件已被其他进程更新或删除
+                self._invalidate(symbol)
+                df = None
+            from_disk = df is None
+            if from_disk:
+                # 有预加载任务时直接等待其结果
+                future = self._pending.pop(symbol, None)
+                df = future.result() if future is not None else self._load_sorted(symbol)
+                if df is not None:
+                    self._cache[symbol] = df
+                    self._cache_versions[symbol] = version
             
             if df is not None:
-                # 检查数据是否覆盖请求的时间范围
-                data_start = df.index.min().strftime('%Y-%m-%d')
-                data_end = df.index.max().strftime('%Y-%m-%d')
+                # 检查数据是否覆盖请求的时间范围（索引已排序，直接比较首尾）
+                start_ts, end_ts = self._range_timestamps(df, start, end)
                 
-                if data_start <= start and data_end >= end:
-                    print(f"使用本地缓存数据: {symbol}")
+                if df.index[0].normalize() <= start_ts and df.index[-1] >= end_ts:
+                    if from_disk:
+                        print(f"使用本地缓存数据: {symbol}")
                 else:
                     print(f"本地数据时间范围不足，需要重新下载")
                     need_download = True
@@ -180,20 +575,42 @@ class DataManager:
         
         # 需要下载
         if need_download:
+            self._invalidate(symbol)
             df = self.download_from_yfinance(symbol, start, end)
+            if not df.index.is_monotonic_increasing:
+                df = df.sort_index()
             self.save_data(df, symbol)
+            self._cache[symbol] = df
+            self._cache_versions[symbol] = self.local_version(symbol)
         
-        # 按日期筛选
-        df = df[(df.index >= start) & (df.index <= end)]
+        # 按日期筛选（有序索引上二分查找切片，不复制数据）
+        start_ts, end_ts = self._range_timestamps(df, start, end)
+        df = df.loc[start_ts:end_ts]
+        if not copy_on_write_enabled():
+            # 入口程序未启用写时复制时返回副本，避免调用方修改缓存
+            df = df.copy()
         
         if df.empty:
-            raise ValueError(f"在指定时间范围内没有 {symbol} 的数据")
-        
-        # 缓存数据
-        self._cache[cache_key] = df.copy()
+            raise NoDataError(f"在指定时间范围内没有 {symbol} 的数据")
         
         return df
     
+    def iter_available_symbols(self) -> Iterator[str]:
+        """
+        逐个产出本地已有数据的股票代码
+        
+        Yields:
+            股票代码（大写）
+        """
+        if not os.path.exists(self.data_dir):
+            return
+        
+        with os.scandir(self.data_dir) as it:
+            for entry in it:
+                symbol = self._symbol_from_filename(entry.name)
+                if symbol is not None:
+                    yield symbol
+    
     def list_available_symbols(self) -> List[str]:
         """
         列出可用的股票代码
@@ -201,17 +618,9 @@ class DataManager:
         Returns:
             本地已有数据的股票代码列表 + 推荐的热门股票
         """
-        local_symbols = set()
-        
-        # 扫描本地文件
-        if os.path.exists(self.data_dir):
-            for filename in os.listdir(self.data_dir):
-                if filename.endswith('.csv'):
-                    symbol = filename.replace('.csv', '').upper()
-                    local_symbols.add(symbol)
-        
-        # 合并推荐股票
-        all_symbols = local_symbols.union(set(self.DEFAULT_SYMBOLS))
+        # 扫描本地文件，合并推荐股票
+        all_symbols = set(self.iter_available_symbols())
+        all_symbols.update(self.DEFAULT_SYMBOLS)
         
         return sorted(list(all_symbols))
     
@@ -219,34 +628,166 @@ class DataManager:
         """
         列出本地已下载的数据详情
         
+        优先使用数据清单中的记录；文件的修改时间或大小与清单不一致时
+        才重新读取该文件的摘要，并更新清单。
+        
         Returns:
             包含股票代码和数据范围的列表
         """
-        result = []
-        
         if not os.path.exists(self.data_dir):
-            return result
-        
-        for filename in os.listdir(self.data_dir):
-            if filename.endswith('.csv'):
-                symbol = filename.replace('.csv', '').upper()
-                filepath = os.path.join(self.data_dir, filename)
+            return []
+        
+        with self._manifest_lock:
+            manifest = self._get_manifest()
+            changed = False
+            seen = set()
+        
+            with os.scandir(self.data_dir) as it:
+                for entry in it:
+                    symbol = self._symbol_from_filename(entry.name)
+                    if symbol is None or symbol in seen or not entry.is_file():
+                        continue
+                    seen.add(symbol)
                 
-                try:
-                    df = self.load_csv(symbol)
-                    if df is not None and len(df) > 0:
-                        result.append({
-                            'symbol': symbol,
-                            'start_date': df.index.min().strftime('%Y-%m-%d'),
-                            'end_date': df.index.max().strftime('%Y-%m-%d'),
-                            'records': len(df),
-                            'file_size': os.path.getsize(filepath)
-                        })
-                except Exception:
-                    pass
+                    # 清单中的记录与文件一致时直接使用，否则重新生成
+                    st = entry.stat()
+                    info = manifest.get(symbol)
+                    if (info is not None and info.get('file') == entry.name and
+                            info.get('mtime_ns') == st.st_mtime_ns and
+                            info.get('file_size') == st.st_size):
+                        continue
+                
+                    try:
+                        summary = self._summarize_file(entry.path)
+                        if summary is None:
+                            # 无法只读取元数据时，回退为完整加载
+                            df = self.load_local(symbol)
+                            if df is None or len(df) == 0:
+                                raise ValueError(f"{entry.name} 中没有有效数据")
+                            summary = {
+                                'start_date': df.index.min().strftime('%Y-%m-%d'),
+                                'end_date': df.index.max().strftime('%Y-%m-%d'),
+                                'records': len(df)
+                            }
+                    except Exception:
+                        if manifest.pop(symbol, None) is not None:
+                            changed = True
+                        continue
+                
+                    manifest[symbol] = {
+                        'symbol': symbol,
+                        **summary,
+                        'file_size': st.st_size,
+                        'file': entry.name,
+                        'mtime_ns': st.st_mtime_ns
+                    }
+                    changed = True
+        
+            # 移除文件已不存在的记录
+            for symbol in [s for s in manifest if s not in seen]:
+                del manifest[symbol]
+                changed = True
+        
+            if changed:
+                self._write_manifest()
+        
+            result = [
+                {key: info[key] for key in ('symbol', 'start_date', 'end_date', 'records', 'file_size')}
+                for symbol, info in manifest.items()
+                if symbol in seen
+            ]
         
         return sorted(result, key=lambda x: x['symbol'])
     
+    def _summarize_file(self, filepath: str) -> Optional[Dict[str, Any]]:
+        """
+        不解析完整数据，获取数据文件的日期范围和记录数
+        
+        Parquet读取文件尾部的元数据和日期列统计信息；
+        CSV只读取首尾两行的日期，并按换行符计数。
+        
+        Args:
+            filepath: 数据文件路径
+        
+        Returns:
+            包含 start_date/end_date/records 的字典，无法获取时返回None
+        """
+        if filepath.endswith('.parquet'):
+            if not HAS_PYARROW:
+                return None
+            return self._summarize_parquet(filepath)
+        return self._summarize_csv(filepath)
+    
+    @staticmethod
+    def _summarize_parquet(filepath: str) -> Optional[Dict[str, Any]]:
+        """从Parquet元数据获取日期范围和记录数"""
+        pf = pq.ParquetFile(filepath)
+        meta = pf.metadata
+        if meta.num_rows == 0:
+            return None
+        
+        # pandas写入的Parquet中，日期索引保存为普通列
+        pandas_meta = pf.schema_arrow.pandas_metadata or {}
+        index_columns = pandas_meta.get('index_columns') or []
+        if not index_columns or not isinstance(index_columns[0], str):
+            return None
+        date_col = index_columns[0]
+        col_idx = meta.schema.names.index(date_col)
+        tz = getattr(pf.schema_arrow.field(date_col).type, 'tz', None)
+        
+        mins, maxs = [], []
+        for i in range(meta.num_row_groups):
+            stats = meta.row_group(i).column(col_idx).statistics
+            if stats is None or not stats.has_min_max:
+                return None
+            mins.append(pd.Timestamp(stats.min))
+            maxs.append(pd.Timestamp(stats.max))
+        
+        start, end = min(mins), max(maxs)
+        if tz and start.tzinfo is not None:
+            start, end = start.tz_convert(tz), end.tz_convert(tz)
+        
+        return {
+            'start_date': start.strftime('%Y-%m-%d'),
+            'end_date': end.strftime('%Y-%m-%d'),
+            'records': meta.num_rows
+        }
+    
+    @staticmethod
+    def _summarize_csv(filepath: str) -> Optional[Dict[str, Any]]:
+        """读取CSV首尾两行获取日期范围，按换行符统计记录数"""
+        with open(filepath, 'rb') as f:
+            f.readline()  # 表头
+            first_line = f.readline()
+            if not first_line.strip():
+                return None
+            
+            # 从文件末尾向前读取，直到拿到完整的最后一行
+            size = f.seek(0, os.SEEK_END)
+            window = 256
+            while True:
+                f.seek(max(0, size - window))
+                lines = f.read().rstrip(b'\r\n').split(b'\n')
+                if len(lines) > 1 or window >= size:
+                    last_line = lines[-1]
+                    break
+                window *= 2
+            
+            # 统计行数（减去表头，最后一行可能没有换行符）
+            f.seek(0)
+            newlines = sum(chunk.count(b'\n') for chunk in iter(lambda: f.read(1 << 20), b''))
+            f.seek(size - 1)
+            records = newlines - (1 if f.read(1) == b'\n' else 0)
+        
+        start = pd.Timestamp(first_line.split(b',', 1)[0].decode('utf-8'))
+        end = pd.Timestamp(last_line.split(b',', 1)[0].decode('utf-8'))
+        
+        return {
+            'start_date': start.strftime('%Y-%m-%d'),
+            'end_date': end.strftime('%Y-%m-%d'),
+            'records': records
+        }
+    
     def add_symbol(self, symbol: str, start: Optional[str] = None, 
                    end: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -278,6 +819,54 @@ class DataManager:
                 'error': str(e)
             }
     
+    def add_symbols(self, symbols: List[str], start: Optional[str] = None,
+                    end: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        批量添加股票代码（一次请求下载全部数据）
+        
+        Args:
+            symbols: 股票代码列表
+            start: 开始日期
+            end: 结束日期
+        
+        Returns:
+            每只股票的下载结果信息
+        """
+        start, end = self._default_range(start, end)
+        symbols = [s.upper() for s in symbols]
+        
+        try:
+            frames = self.download_many(symbols, start, end)
+        except Exception as e:
+            return [{'success': False, 'symbol': s, 'error': str(e)} for s in symbols]
+        
+        results = []
+        for symbol in symbols:
+            df = frames.get(symbol)
+            if df is None:
+                results.append({
+                    'success': False,
+                    'symbol': symbol,
+                    'error': f"无法获取 {symbol} 的数据，请检查股票代码是否正确"
+                })
+                continue
+            
+            if not df.index.is_monotonic_increasing:
+                df = df.sort_index()
+            self.save_data(df, symbol)
+            self._cache[symbol] = df
+            self._cache_versions[symbol] = self.local_version(symbol)
+            
+            results.append({
+                'success': True,
+                'symbol': symbol,
+                'records': len(df),
+                'start_date': df.index.min().strftime('%Y-%m-%d'),
+                'end_date': df.index.max().strftime('%Y-%m-%d')
+            })
+        
+        return results
+    
     def delete_symbol(self, symbol: str) -> bool:
         """
         删除股票数据
@@ -289,20 +878,49 @@ class DataManager:
             是否删除成功
         """
         symbol = symbol.upper()
-        filepath = os.path.join(self.data_dir, f"{symbol}.csv")
-        
-        if os.path.exists(filepath):
-            os.remove(filepath)
-            # 清除缓存
-            keys_to_remove = [k for k in self._cache if k.startswith(symbol)]
-            for k in keys_to_remove:
-                del self._cache[k]
+        deleted = False
+        
+        for suffix in DATA_SUFFIXES:
+            filepath = self._data_path(symbol, suffix)
+            if os.path.exists(filepath):
+                os.remove(filepath)
+                deleted = True
+        
+        if deleted:
+            self._invalidate(symbol)
+            with self._manifest_lock:
+                if self._get_manifest().pop(symbol, None) is not None:
+                    self._write_manifest()
             return True
         return False
     
+    def _invalidate(self, symbol: str) -> None:
+        """清除单只股票的缓存和未完成的预加载任务"""
+        self._cache.pop(symbol, None)
+        self._cache_versions.pop(symbol, None)
+        future = self._pending.pop(symbol, None)
+        if future is not None:
+            future.cancel()
+    
     def clear_cache(self) -> None:
         """清除内存缓存"""
         self._cache.clear()
+        self._cache_versions.clear()
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+    
+    def close(self) -> None:
+        """取消未完成的预加载任务并关闭预加载线程池和HTTP会话"""
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        if self._prefetch_pool is not None:
+            self._prefetch_pool.shutdown(wait=False, cancel_futures=True)
+            self._prefetch_pool = None
+        if self._session is not None:
+            self._session.close()
+            self._session = None
 
 
 # 便捷函数
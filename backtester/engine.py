@@ -4,19 +4,62 @@
 负责执行策略回测，计算性能指标。
 """
 
-import sys
 import os
 import json
-from datetime import datetime
-from typing import Dict, Any, List, Optional, Type
+import importlib
+import inspect
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Tuple, Type
 import pandas as pd
 import numpy as np
 
-# 添加项目根目录到路径
-sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
 
 from strategies.base_strategy import BaseStrategy
-from backtester.data_manager import DataManager
+from backtester.data_manager import DataManager, enable_copy_on_write
+from backtester._engine_kernels import HAS_NUMBA, KERNELS, SIDE_BUY, SIDE_SELL
+
+
+def format_index(index: pd.Index) -> List[str]:
+    """
+    将时间索引整体格式化为ISO字符串列表（结果与逐项调用 isoformat() 一致）
+    
+    DatetimeIndex 使用向量化的 strftime；带时区时把 +0800 形式的偏移
+    转为 isoformat 的 +08:00 形式。
+    """
+    if isinstance(index, pd.DatetimeIndex):
+        if (index.microsecond != 0).any() or (index.nanosecond != 0).any():
+            return [idx.isoformat() for idx in index]
+        if index.tz is None:
+            return index.strftime('%Y-%m-%dT%H:%M:%S').tolist()
+        formatted = pd.Index(index.strftime('%Y-%m-%dT%H:%M:%S%z'))
+        return formatted.str.replace(r'([+-]\d{2})(\d{2})$', r'\1:\2', regex=True).tolist()
+    return [idx.isoformat() if hasattr(idx, 'isoformat') else str(idx) for idx in index]
+
+
+def _json_default(obj: Any) -> Any:
+    """标准库json回退路径下序列化NumPy类型"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.generic):
+        return obj.item()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _dump_results(results: Dict[str, Any]) -> bytes:
+    """将回测结果序列化为带缩进的UTF-8 JSON（优先使用orjson）"""
+    if HAS_ORJSON:
+        return orjson.dumps(
+            results,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+        )
+    return json.dumps(results, indent=2, ensure_ascii=False, default=_json_default).encode('utf-8')
 
 
 class BacktestEngine:
@@ -37,11 +80,26 @@ class BacktestEngine:
             initial_capital: 初始资金
         """
         self.strategy = strategy
-        self.data = data.copy()
+        # 引擎只读取数据（列数组与索引），无需复制
+        self.data = data
         self.initial_capital = initial_capital
         self.trades: List[Dict[str, Any]] = []
         self.equity_curve: List[Dict[str, Any]] = []
         self.signals: List[Dict[str, Any]] = []
+        
+        # 成交价格与方向（SIDE_BUY/SIDE_SELL）的并行列表，用于向量化统计
+        self._trade_px: List[float] = []
+        self._trade_side: List[int] = []
+        
+        # 权益曲线按列存储（SoA），与 self.data 逐行对应
+        self._eq_value = np.empty(0)
+        self._eq_cash = np.empty(0)
+        self._eq_pos_val = np.empty(0)
+        self._eq_price = np.empty(0)
+        
+        # 预先格式化的时间索引（ISO字符串 / 日期），与 self.data 逐行对应
+        self._idx_iso: List[str] = []
+        self._idx_date: List[Any] = []
     
     def run(self, verbose: bool = True) -> Dict[str, Any]:
         """
@@ -64,23 +122,54 @@ class BacktestEngine:
         self.trades = []
         self.equity_curve = []
         self.signals = []
+        self._trade_px = []
+        self._trade_side = []
+        self._idx_iso = format_index(self.data.index)
+        index = self.data.index
+        self._idx_date = index.date.tolist() if isinstance(index, pd.DatetimeIndex) else list(index)
+        
+        # 纯数值策略使用编译内核运行整个循环。只认策略类自身声明的内核：
+        # 子类继承来的 numba_kernel 会绕过其重写的交易逻辑，因此不使用
+        kernel_name = type(self.strategy).__dict__.get('numba_kernel')
+        if HAS_NUMBA and kernel_name in KERNELS:
+            self._run_kernel(KERNELS[kernel_name], verbose)
+            return self._calculate_metrics()
+        
+        # 一次性取出连续的OHLCV数组，避免逐行构造Series
+        columns = self.data.columns
+        opens = self.data['open'].to_numpy(dtype=np.float64).tolist()
+        highs = self.data['high'].to_numpy(dtype=np.float64).tolist()
+        lows = self.data['low'].to_numpy(dtype=np.float64).tolist()
+        closes = self.data['close'].to_numpy(dtype=np.float64).tolist()
+        if 'volume' in columns:
+            volumes = self.data['volume'].to_numpy(dtype=np.float64).tolist()
+        else:
+            volumes = [0.0] * len(self.data)
+        
+        # 预分配权益曲线数组，循环中按下标写入
+        n = len(self.data)
+        eq_value = self._eq_value = np.empty(n)
+        eq_cash = self._eq_cash = np.empty(n)
+        eq_pos_val = self._eq_pos_val = np.empty(n)
+        self._eq_price = np.asarray(closes, dtype=np.float64)
+        
+        # K线字典在每根K线间复用（策略如需保存请自行复制）
+        bar: Dict[str, Any] = {}
         
         # 遍历每个K线
-        for idx, row in self.data.iterrows():
-            bar = {
-                'datetime': idx,
-                'open': float(row['open']),
-                'high': float(row['high']),
-                'low': float(row['low']),
-                'close': float(row['close']),
-                'volume': float(row['volume']) if 'volume' in row else 0
-            }
+        for i, idx in enumerate(self.data.index):
+            bar['datetime'] = idx
+            bar['open'] = opens[i]
+            bar['high'] = highs[i]
+            bar['low'] = lows[i]
+            bar['close'] = closes[i]
+            bar['volume'] = volumes[i]
             
             # 策略处理K线
             self.strategy.on_bar(bar)
             
             # 获取当前价格用于计算持仓价值
-            current_price = bar['close']
+            current_price = closes[i]
             
             # 检查买入信号
             if self.strategy.should_buy():
@@ -90,21 +179,7 @@ class BacktestEngine:
                 success = self.strategy.buy(current_price, size)
                 
                 if success:
-                    trade = {
-                        'datetime': idx.isoformat() if hasattr(idx, 'isoformat') else str(idx),
-                        'type': 'BUY',
-                        'price': current_price,
-                        'size': self.strategy.position
-                    }
-                    self.trades.append(trade)
-                    self.signals.append({
-                        'datetime': idx.isoformat() if hasattr(idx, 'isoformat') else str(idx),
-                        'signal': 'BUY',
-                        'price': current_price
-                    })
-                    if verbose:
-                        date_str = idx.date() if hasattr(idx, 'date') else idx
-                        print(f"{date_str}: 买入 @ {current_price:.2f}, 数量: {self.strategy.position:.2f}")
+                    self._record_trade(i, 'BUY', current_price, self.strategy.position, verbose)
             
             # 检查卖出信号
             elif self.strategy.should_sell():
@@ -112,38 +187,89 @@ class BacktestEngine:
                 success = self.strategy.sell(current_price)
                 
                 if success:
-                    trade = {
-                        'datetime': idx.isoformat() if hasattr(idx, 'isoformat') else str(idx),
-                        'type': 'SELL',
-                        'price': current_price,
-                        'size': size
-                    }
-                    self.trades.append(trade)
-                    self.signals.append({
-                        'datetime': idx.isoformat() if hasattr(idx, 'isoformat') else str(idx),
-                        'signal': 'SELL',
-                        'price': current_price
-                    })
-                    if verbose:
-                        date_str = idx.date() if hasattr(idx, 'date') else idx
-                        print(f"{date_str}: 卖出 @ {current_price:.2f}, 数量: {size:.2f}")
+                    self._record_trade(i, 'SELL', current_price, size, verbose)
             
             # 计算当前权益
             position_value = self.strategy.position * current_price
-            total_value = self.strategy.cash + position_value
-            
-            self.equity_curve.append({
-                'datetime': idx.isoformat() if hasattr(idx, 'isoformat') else str(idx),
-                'value': total_value,
-                'cash': self.strategy.cash,
-                'position_value': position_value,
-                'price': current_price
-            })
+            eq_pos_val[i] = position_value
+            eq_cash[i] = self.strategy.cash
+            eq_value[i] = self.strategy.cash + position_value
         
         # 计算最终指标
         results = self._calculate_metrics()
         return results
     
+    def _record_trade(self, i: int, trade_type: str, price: float, size: float,
+                      verbose: bool) -> None:
+        """记录第i根K线上的一笔成交及对应信号"""
+        datetime_str = self._idx_iso[i]
+        self._trade_px.append(price)
+        self._trade_side.append(SIDE_BUY if trade_type == 'BUY' else SIDE_SELL)
+        self.trades.append({
+            'datetime': datetime_str,
+            'type': trade_type,
+            'price': price,
+            'size': size
+        })
+        self.signals.append({
+            'datetime': datetime_str,
+            'signal': trade_type,
+            'price': price
+        })
+        if verbose:
+            date_str = self._idx_date[i]
+            action = '买入' if trade_type == 'BUY' else '卖出'
+            print(f"{date_str}: {action} @ {price:.2f}, 数量: {size:.2f}")
+    
+    def _run_kernel(self, kernel, verbose: bool) -> None:
+        """
+        使用编译内核运行回测循环，再由返回的数组还原交易和权益记录
+        
+        Args:
+            kernel: _engine_kernels 中的内核函数
+            verbose: 是否输出详细信息
+        """
+        closes = np.ascontiguousarray(self.data['close'].to_numpy(dtype=np.float64))
+        (trade_idx, trade_side, trade_price, trade_size,
+         equity, cash, position_value, fast_ma, slow_ma) = kernel(
+            closes, float(self.initial_capital), *self.strategy.get_kernel_args()
+        )
+        
+        for i, side, price, size in zip(trade_idx.tolist(), trade_side.tolist(),
+                                        trade_price.tolist(), trade_size.tolist()):
+            self._record_trade(i, 'BUY' if side == SIDE_BUY else 'SELL', price, size, verbose)
+        
+        self._eq_value = equity
+        self._eq_cash = cash
+        self._eq_pos_val = position_value
+        self._eq_price = closes
+        
+        # 同步策略的最终状态
+        self.strategy.cash = float(cash[-1]) if len(cash) else self.initial_capital
+        if len(trade_side) and trade_side[-1] == SIDE_BUY:
+            self.strategy.position = float(trade_size[-1])
+            self.strategy.entry_price = float(trade_price[-1])
+        elif len(trade_side):
+            self.strategy.position = 0.0
+        self.strategy.fast_ma = None if np.isnan(fast_ma) else float(fast_ma)
+        self.strategy.slow_ma = None if np.isnan(slow_ma) else float(slow_ma)
+    
+    def _build_equity_curve(self) -> List[Dict[str, Any]]:
+        """由权益数组生成JSON友好的权益曲线记录"""
+        return [
+            {
+                'datetime': datetime_str,
+                'value': value,
+                'cash': cash,
+                'position_value': pos_value,
+                'price': price
+            }
+            for datetime_str, value, cash, pos_value, price in zip(
+                self._idx_iso, self._eq_value.tolist(), self._eq_cash.tolist(),
+                self._eq_pos_val.tolist(), self._eq_price.tolist()
+            )
+        ]
+    
     def _calculate_metrics(self) -> Dict[str, Any]:
         """
         计算性能指标
@@ -151,7 +277,7 @@ class BacktestEngine:
         Returns:
             包含各种性能指标的字典
         """
-        if not self.equity_curve:
+        if len(self._eq_value) == 0:
             return {
                 'final_value': self.initial_capital,
                 'return_pct': 0,
@@ -159,37 +285,33 @@ class BacktestEngine:
                 'error': 'No data'
             }
         
-        # 权益曲线数据
-        equity_values = [e['value'] for e in self.equity_curve]
-        equity_df = pd.DataFrame(self.equity_curve)
-        equity_df['datetime'] = pd.to_datetime(equity_df['datetime'])
-        equity_df.set_index('datetime', inplace=True)
+        # 权益曲线数据（已是连续数组）
+        equity_values = self._eq_value
+        self.equity_curve = self._build_equity_curve()
         
         # 基本指标
-        final_value = equity_values[-1]
+        final_value = float(equity_values[-1])
         total_return = (final_value - self.initial_capital) / self.initial_capital * 100
         
-        # 交易统计
-        buy_trades = [t for t in self.trades if t['type'] == 'BUY']
-        sell_trades = [t for t in self.trades if t['type'] == 'SELL']
-        total_trades = min(len(buy_trades), len(sell_trades))
+        # 交易统计：第i次买入与第i次卖出配对
+        trade_px = np.asarray(self._trade_px, dtype=np.float64)
+        trade_side = np.asarray(self._trade_side, dtype=np.int8)
+        buy_px = trade_px[trade_side == SIDE_BUY]
+        sell_px = trade_px[trade_side == SIDE_SELL]
+        total_trades = min(len(buy_px), len(sell_px))
         
         # 计算每笔交易盈亏
-        profits = []
-        for i in range(total_trades):
-            buy_price = buy_trades[i]['price']
-            sell_price = sell_trades[i]['price']
-            profit_pct = ((sell_price - buy_price) / buy_price) * 100
-            profits.append(profit_pct)
+        buy_px = buy_px[:total_trades]
+        profits = (sell_px[:total_trades] - buy_px) / buy_px * 100
         
-        won_trades = len([p for p in profits if p > 0])
-        lost_trades = len([p for p in profits if p <= 0])
+        won_trades = int((profits > 0).sum())
+        lost_trades = total_trades - won_trades
         
         # 最大回撤
         max_drawdown = self._calculate_max_drawdown(equity_values)
         
         # 夏普比率（假设无风险利率为0）
-        sharpe_ratio = self._calculate_sharpe_ratio(equity_df['value'])
+        sharpe_ratio = self._calculate_sharpe_ratio(equity_values)
         
         # 年化收益率
         days = (self.data.index[-1] - self.data.index[0]).days
@@ -210,13 +332,13 @@ class BacktestEngine:
             'won_trades': won_trades,
             'lost_trades': lost_trades,
             'win_rate': round(won_trades / total_trades * 100, 2) if total_trades > 0 else 0,
-            'avg_profit_pct': round(np.mean(profits), 2) if profits else 0,
-            'max_profit_pct': round(max(profits), 2) if profits else 0,
-            'max_loss_pct': round(min(profits), 2) if profits else 0,
+            'avg_profit_pct': round(float(profits.mean()), 2) if total_trades else 0,
+            'max_profit_pct': round(float(profits.max()), 2) if total_trades else 0,
+            'max_loss_pct': round(float(profits.min()), 2) if total_trades else 0,
             'max_consecutive_losses': max_consecutive_losses,
             'profit_factor': self._calculate_profit_factor(profits),
-            'start_date': self.data.index[0].isoformat() if hasattr(self.data.index[0], 'isoformat') else str(self.data.index[0]),
-            'end_date': self.data.index[-1].isoformat() if hasattr(self.data.index[-1], 'isoformat') else str(self.data.index[-1]),
+            'start_date': self._idx_iso[0],
+            'end_date': self._idx_iso[-1],
             'trading_days': len(self.data),
             'trades': self.trades,
             'equity_curve': self.equity_curve,
@@ -225,54 +347,47 @@ class BacktestEngine:
         
         return results
     
-    def _calculate_max_drawdown(self, equity_values: List[float]) -> float:
-        """计算最大回撤"""
-        peak = equity_values[0]
-        max_dd = 0
-        
-        for value in equity_values:
-            if value > peak:
-                peak = value
-            drawdown = (peak - value) / peak * 100
-            if drawdown > max_dd:
-                max_dd = drawdown
-        
-        return max_dd
+    def _calculate_max_drawdown(self, equity_values) -> float:
+        """计算最大回撤（百分比）"""
+        equity = np.asarray(equity_values, dtype=np.float64)
+        peaks = np.maximum.accumulate(equity)
+        drawdowns = (peaks - equity) / peaks
+        return float(drawdowns.max() * 100.0)
     
-    def _calculate_sharpe_ratio(self, equity_series: pd.Series, 
+    def _calculate_sharpe_ratio(self, equity_values, 
                                  risk_free_rate: float = 0.0) -> float:
         """计算夏普比率（年化）"""
-        daily_returns = equity_series.pct_change().dropna()
+        equity = np.asarray(equity_values, dtype=np.float64)
+        daily_returns = np.diff(equity) / equity[:-1]
         
         if len(daily_returns) < 2:
             return 0.0
         
         excess_returns = daily_returns - risk_free_rate / 252
+        std = excess_returns.std(ddof=1)
         
-        if excess_returns.std() == 0:
+        if std == 0:
             return 0.0
         
-        sharpe = np.sqrt(252) * excess_returns.mean() / excess_returns.std()
-        return sharpe
+        sharpe = np.sqrt(252) * excess_returns.mean() / std
+        return float(sharpe)
     
-    def _calculate_max_consecutive_losses(self, profits: List[float]) -> int:
+    def _calculate_max_consecutive_losses(self, profits: np.ndarray) -> int:
         """计算最大连续亏损次数"""
-        max_losses = 0
-        current_losses = 0
+        is_loss = np.asarray(profits, dtype=np.float64) <= 0
+        if not is_loss.size:
+            return 0
         
-        for p in profits:
-            if p <= 0:
-                current_losses += 1
-                max_losses = max(max_losses, current_losses)
-            else:
-                current_losses = 0
-        
-        return max_losses
+        # 盈利交易的位置把亏损分段，首尾加哨兵后相邻间隔-1即为每段亏损长度
+        wins = np.flatnonzero(~is_loss)
+        bounds = np.r_[-1, wins, is_loss.size]
+        return int((np.diff(bounds) - 1).max())
     
-    def _calculate_profit_factor(self, profits: List[float]) -> float:
+    def _calculate_profit_factor(self, profits: np.ndarray) -> float:
         """计算盈亏比"""
-        gross_profit = sum(p for p in profits if p > 0)
-        gross_loss = abs(sum(p for p in profits if p < 0))
+        values = np.asarray(profits, dtype=np.float64)
+        gross_profit = float(values[values > 0].sum())
+        gross_loss = float(-values[values < 0].sum())
         
         if gross_loss == 0:
             return float('inf') if gross_profit > 0 else 0
@@ -309,16 +424,33 @@ class BacktestEngine:
         print(f"{'='*60}\n")
     
     def save_results(self, results: Dict[str, Any], filepath: str) -> None:
-        """
-        保存回测结果到JSON
-        
-        Args:
-            results: 回测结果
-            filepath: 文件路径
-        """
-        with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(results, f, indent=2, ensure_ascii=False)
-        print(f"结果已保存到: {filepath}")
+        """保存回测结果到JSON（兼容旧接口，见模块级 save_results）"""
+        save_results(results, filepath)
+
+
+def save_results(results: Dict[str, Any], filepath: str) -> None:
+    """
+    保存回测结果到JSON
+    
+    Args:
+        results: 回测结果
+        filepath: 文件路径
+    """
+    with open(filepath, 'wb') as f:
+        f.write(_dump_results(results))
+    print(f"结果已保存到: {filepath}")
+
+
+# 策略模块名 -> 策略类
+_STRAT_CACHE: Dict[str, Type[BaseStrategy]] = {}
+
+
+def _find_strategy_class(module) -> Optional[Type[BaseStrategy]]:
+    """查找模块中第一个继承自BaseStrategy的类（按名称排序）"""
+    for _, obj in inspect.getmembers(module, inspect.isclass):
+        if issubclass(obj, BaseStrategy) and obj is not BaseStrategy:
+            return obj
+    return None
 
 
 def load_strategy(strategy_name: str, params: Optional[Dict[str, Any]] = None):
@@ -332,25 +464,18 @@ def load_strategy(strategy_name: str, params: Optional[Dict[str, Any]] = None):
     Returns:
         策略实例
     """
-    import importlib
-    
-    try:
-        module = importlib.import_module(f'strategies.{strategy_name}')
-    except ImportError as e:
-        raise ImportError(f"无法加载策略 '{strategy_name}': {e}")
-    
-    # 查找策略类（继承自BaseStrategy的类）
-    strategy_class = None
-    for name in dir(module):
-        obj = getattr(module, name)
-        if (isinstance(obj, type) and 
-            issubclass(obj, BaseStrategy) and 
-            obj is not BaseStrategy):
-            strategy_class = obj
-            break
-    
+    strategy_class = _STRAT_CACHE.get(strategy_name)
     if strategy_class is None:
-        raise ValueError(f"在 '{strategy_name}' 中找不到有效的策略类")
+        try:
+            module = importlib.import_module(f'strategies.{strategy_name}')
+        except ImportError as e:
+            raise ImportError(f"无法加载策略 '{strategy_name}': {e}")
+        
+        # 查找策略类（继承自BaseStrategy的类）
+        strategy_class = _find_strategy_class(module)
+        if strategy_class is None:
+            raise ValueError(f"在 '{strategy_name}' 中找不到有效的策略类")
+        _STRAT_CACHE[strategy_name] = strategy_class
     
     return strategy_class(params)
 
@@ -362,7 +487,6 @@ def list_strategies() -> List[Dict[str, Any]]:
     Returns:
         策略信息列表
     """
-    import importlib
     import pkgutil
     import strategies
     
@@ -383,28 +507,67 @@ def list_strategies() -> List[Dict[str, Any]]:
                 })
             else:
                 # 尝试获取基本信息
-                for name in dir(module):
-                    obj = getattr(module, name)
-                    if (isinstance(obj, type) and 
-                        issubclass(obj, BaseStrategy) and 
-                        obj is not BaseStrategy):
-                        available.append({
-                            'module': modname,
-                            'name': getattr(obj, 'name', modname),
-                            'description': obj.__doc__ or ''
-                        })
-                        break
+                strategy_class = _STRAT_CACHE.get(modname) or _find_strategy_class(module)
+                if strategy_class is not None:
+                    _STRAT_CACHE[modname] = strategy_class
+                    available.append({
+                        'module': modname,
+                        'name': getattr(strategy_class, 'name', modname),
+                        'description': strategy_class.__doc__ or ''
+                    })
         except Exception as e:
             print(f"Warning: 无法加载策略 {modname}: {e}")
     
     return available
 
 
+# 模块级共享的数据管理器，首次使用时创建
+_DM: Optional[DataManager] = None
+
+
+def _get_data_manager() -> DataManager:
+    """获取共享的DataManager实例"""
+    global _DM
+    if _DM is None:
+        _DM = DataManager()
+    return _DM
+
+
+@lru_cache(maxsize=64)
+def _get_cached(symbol: str, start: Optional[str], end: Optional[str],
+                today: date, version: Optional[int]) -> pd.DataFrame:
+    """
+    按 (symbol, start, end, 当天日期, 数据文件修改时间) 缓存回测数据，
+    重复回测同一区间时不再重新获取
+    
+    未指定日期时默认范围随日期变化；数据文件被重新下载或删除后修改时间改变，
+    长期运行的进程不会一直使用旧数据。
+    返回的DataFrame被多次回测共享，调用方不得原地修改
+    （BacktestEngine 只读取数据）。
+    """
+    return _get_data_manager().get_data(symbol, start, end)
+
+
+def _get_window(symbol: str, start: Optional[str], end: Optional[str]) -> pd.DataFrame:
+    """获取回测数据（经 _get_cached 缓存）"""
+    symbol = symbol.upper()
+    return _get_cached(symbol, start, end, date.today(),
+                       _get_data_manager().local_version(symbol))
+
+
+def clear_data_cache() -> None:
+    """清空回测数据缓存（本地数据更新后调用）"""
+    _get_cached.cache_clear()
+    if _DM is not None:
+        _DM.clear_cache()
+
+
 def run_backtest(strategy_name: str, symbol: str, 
                  start: str = None, end: str = None,
                  params: Dict[str, Any] = None,
                  initial_capital: float = 100000.0,
-                 verbose: bool = True) -> Dict[str, Any]:
+                 verbose: bool = True,
+                 data: Optional[pd.DataFrame] = None) -> Dict[str, Any]:
     """
     便捷函数：运行完整回测
     
@@ -416,6 +579,7 @@ def run_backtest(strategy_name: str, symbol: str,
         params: 策略参数
         initial_capital: 初始资金
         verbose: 详细输出
+        data: 已加载的OHLCV数据，为None时通过DataManager获取
     
     Returns:
         回测结果
@@ -424,8 +588,8 @@ def run_backtest(strategy_name: str, symbol: str,
     strategy = load_strategy(strategy_name, params)
     
     # 加载数据
-    dm = DataManager()
-    data = dm.get_data(symbol, start, end)
+    if data is None:
+        data = _get_window(symbol, start, end)
     
     # 运行回测
     engine = BacktestEngine(strategy, data, initial_capital)
@@ -437,10 +601,107 @@ def run_backtest(strategy_name: str, symbol: str,
     return results
 
 
+# 工作进程内的预取数据：(symbol, start, end) -> DataFrame
+_WORKER_DATA: Dict[tuple, pd.DataFrame] = {}
+
+
+def _job_key(job: Dict[str, Any]) -> tuple:
+    """回测任务对应的数据键"""
+    return (job['symbol'].upper(), job.get('start'), job.get('end'))
+
+
+def _init_worker(frames: Dict[tuple, pd.DataFrame]) -> None:
+    """工作进程初始化：接收父进程预取的数据"""
+    global _WORKER_DATA
+    _WORKER_DATA = frames
+
+
+def _run_one(job: Dict[str, Any]) -> Dict[str, Any]:
+    """在工作进程中运行单个回测任务（模块级函数，可被pickle）"""
+    return run_backtest(
+        strategy_name=job['strategy'],
+        symbol=job['symbol'],
+        start=job.get('start'),
+        end=job.get('end'),
+        params=job.get('params'),
+        initial_capital=job.get('initial_capital', 100000.0),
+        verbose=False,
+        data=_WORKER_DATA.get(_job_key(job))
+    )
+
+
+def run_backtests(jobs: List[Dict[str, Any]],
+                  max_workers: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    并行运行多个回测任务（如参数网格搜索）
+    
+    数据在父进程中按 (symbol, start, end) 去重预取一次，
+    通过进程池初始化函数分发给各工作进程。
+    
+    Args:
+        jobs: 任务列表，每项包含 strategy, symbol, params, start, end, initial_capital
+        max_workers: 最大进程数，默认为CPU核数
+    
+    Returns:
+        与 jobs 顺序一致的回测结果列表
+    """
+    if not jobs:
+        return []
+    
+    # 预取所有任务所需的数据
+    _get_data_manager().prefetch(sorted({job['symbol'].upper() for job in jobs}))
+    frames = {}
+    for job in jobs:
+        key = _job_key(job)
+        if key not in frames:
+            frames[key] = _get_window(*key)
+    
+    workers = max_workers or os.cpu_count() or 1
+    chunksize = max(1, len(jobs) // (4 * workers))
+    
+    with ProcessPoolExecutor(max_workers=workers,
+                             initializer=_init_worker,
+                             initargs=(frames,)) as executor:
+        return list(executor.map(_run_one, jobs, chunksize=chunksize))
+
+
+def run_param_sweep(strategy_name: str, symbol: str, data: pd.DataFrame,
+                    param_sets: List[Dict[str, Any]],
+                    initial_capital: float = 100000.0) -> List[Tuple[bool, Any]]:
+    """
+    在同一份数据上依次运行多组参数的回测
+    
+    供进程池按组提交：每个任务只传一次数据和一组参数列表，
+    不必为每组参数各传一份数据。单组失败不影响其他组。
+    
+    Args:
+        strategy_name: 策略名称
+        symbol: 股票代码
+        data: OHLCV数据
+        param_sets: 参数列表
+        initial_capital: 初始资金
+    
+    Returns:
+        与 param_sets 顺序一致的 (是否成功, 回测结果或错误信息) 列表
+    """
+    outcomes = []
+    for params in param_sets:
+        try:
+            outcomes.append((True, run_backtest(
+                strategy_name, symbol, params=params,
+                initial_capital=initial_capital, verbose=False, data=data
+            )))
+        except Exception as e:
+            outcomes.append((False, str(e)))
+    return outcomes
+
+
 def main():
     """主函数 - 命令行入口"""
     import argparse
     
+    enable_copy_on_write()
+    
     parser = argparse.ArgumentParser(description='策略回测引擎')
     parser.add_argument('--strategy', type=str, help='策略名称')
     parser.add_argument('--stock', type=str, help='股票代码')
@@ -488,9 +749,7 @@ def main():
         output_dir = os.path.join(os.path.dirname(__file__), 'results')
         os.makedirs(output_dir, exist_ok=True)
         output_path = os.path.join(output_dir, args.output)
-        
-        engine = BacktestEngine(None, pd.DataFrame())
-        engine.save_results(results, output_path)
+        save_results(results, output_path)
 
 
 if __name__ == '__main__':
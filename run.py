@@ -8,36 +8,26 @@ PythonTradeView 启动脚本
 """
 
 import sys
-import os
-
-# 添加项目根目录到路径
-PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
-sys.path.insert(0, PROJECT_ROOT)
 
 
 def run_webui():
     """启动 WebUI 服务"""
     try:
-        import uvicorn
+        import uvicorn  # noqa: F401
+        from webui.server import PORT, serve
         print("=" * 60)
         print("  PythonTradeView - 策略回测系统")
         print("=" * 60)
         print()
         print("  启动 WebUI 服务...")
-        print("  访问地址: http://localhost:8000")
+        print(f"  访问地址: http://localhost:{PORT}")
         print()
         print("  按 Ctrl+C 停止服务")
         print("=" * 60)
         print()
         
         # 使用模块路径而非切换目录
-        uvicorn.run(
-            "webui.app:app",
-            host="0.0.0.0",
-            port=8000,
-            reload=True,
-            reload_dirs=[PROJECT_ROOT]
-        )
+        serve("webui.app:app")
     except ImportError as e:
         print(f"错误: {e}")
         print("请先安装依赖:")
@@ -1,9 +1,14 @@
 import requests
 import logging
+from requests.adapters import HTTPAdapter
 from src import config
 
 logger = logging.getLogger(__name__)
 
+# 复用到 api.telegram.org 的连接（keep-alive），避免每条预警重新握手TLS
+_SESSION = requests.Session()
+_SESSION.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=4))
+
 def send_alert(message: str):
     """
     通过Telegram Bot发送预警信息。
@@ -25,7 +30,7 @@ def send_alert(message: str):
     }
 
     try:
-        response = requests.post(url, json=payload, timeout=10)
+        response = _SESSION.post(url, json=payload, timeout=10)
         response.raise_for_status()
         logger.info("预警信息发送成功！")
     except requests.exceptions.Timeout:
@@ -0,0 +1,194 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+DetailedStrategy 买入信号的编译内核
+
+指标计算与信号判断都是对float64数组/标量的纯数值运算，
+使用Numba编译为机器码；未安装numba时以普通Python函数运行。
+"""
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+    def njit(*args, **kwargs):
+        """未安装numba时的空装饰器"""
+        if len(args) == 1 and callable(args[0]) and not kwargs:
+            return args[0]
+        return lambda func: func
+
+
+# 指标计算至少需要的K线数量（EMA200）
+MIN_BARS = 200
+RSI_PERIOD = 14
+BOLL_PERIOD = 20
+VOL_MA_PERIOD = 20
+EMA_SPANS = (12, 20, 26, 50, 200)
+MACD_SIGNAL_SPAN = 9
+
+# EMA平滑系数 alpha = 2 / (span + 1)，模块常量在编译时直接折叠进内核
+ALPHA_EMA = {span: 2.0 / (span + 1) for span in EMA_SPANS + (MACD_SIGNAL_SPAN,)}
+ALPHA_9 = ALPHA_EMA[9]
+ALPHA_12 = ALPHA_EMA[12]
+ALPHA_20 = ALPHA_EMA[20]
+ALPHA_26 = ALPHA_EMA[26]
+ALPHA_50 = ALPHA_EMA[50]
+ALPHA_200 = ALPHA_EMA[200]
+
+# 信号编号
+SIGNAL_NONE = 0
+SIGNAL_BOLL_PULLBACK = 1   # 方案A: BOLL中轨回调
+SIGNAL_MACD_CROSS = 2      # 方案B: MACD金叉
+SIGNAL_BOLL_BREAKOUT = 3   # 方案C: BOLL突破
+
+
+@njit(cache=True)
+def indicators(close, volume):
+    """
+    计算信号判断所需的最新指标值
+
+    EMA 与 pandas ewm(span, adjust=False) 一致；RSI 使用最近14个涨跌幅的简单均值；
+    布林带标准差为样本标准差（ddof=1）。
+
+    Args:
+        close: 收盘价数组 (float64)
+        volume: 成交量数组 (float64)
+
+    Returns:
+        (close, volume, ema20[-3], ema20[-2], ema20[-1], ema50, ema200,
+         macd[-2], macd[-1], signal[-2], signal[-1], rsi, boll_mid, boll_upper, vol_ma)
+    """
+    n = close.shape[0]
+    a12 = ALPHA_12
+    a20 = ALPHA_20
+    a26 = ALPHA_26
+    a50 = ALPHA_50
+    a200 = ALPHA_200
+    a9 = ALPHA_9
+
+    # 单次遍历计算全部EMA与MACD信号线，只保留最后几个值
+    ema12 = ema20 = ema26 = ema50 = ema200 = close[0]
+    macd = 0.0
+    signal = 0.0
+    ema20_3 = ema20_2 = ema20
+    macd_prev = macd
+    signal_prev = signal
+    for i in range(1, n):
+        x = close[i]
+        ema12 = a12 * x + (1.0 - a12) * ema12
+        ema20_3 = ema20_2
+        ema20_2 = ema20
+        ema20 = a20 * x + (1.0 - a20) * ema20
+        ema26 = a26 * x + (1.0 - a26) * ema26
+        ema50 = a50 * x + (1.0 - a50) * ema50
+        ema200 = a200 * x + (1.0 - a200) * ema200
+        macd_prev = macd
+        signal_prev = signal
+        macd = ema12 - ema26
+        signal = a9 * macd + (1.0 - a9) * signal
+
+    # RSI
+    gain = 0.0
+    loss = 0.0
+    for i in range(n - RSI_PERIOD, n):
+        delta = close[i] - close[i - 1]
+        if delta > 0:
+            gain += delta
+        elif delta < 0:
+            loss -= delta
+    gain /= RSI_PERIOD
+    loss /= RSI_PERIOD
+    if loss == 0.0:
+        rsi = 100.0 if gain > 0 else np.nan
+    else:
+        rsi = 100.0 - 100.0 / (1.0 + gain / loss)
+
+    # 布林带
+    total = 0.0
+    for i in range(n - BOLL_PERIOD, n):
+        total += close[i]
+    boll_mid = total / BOLL_PERIOD
+    sq = 0.0
+    for i in range(n - BOLL_PERIOD, n):
+        d = close[i] - boll_mid
+        sq += d * d
+    boll_upper = boll_mid + 2.0 * np.sqrt(sq / (BOLL_PERIOD - 1))
+
+    # 成交量均线
+    vol_total = 0.0
+    for i in range(n - VOL_MA_PERIOD, n):
+        vol_total += volume[i]
+    vol_ma = vol_total / VOL_MA_PERIOD
+
+    return (close[n - 1], volume[n - 1], ema20_3, ema20_2, ema20, ema50, ema200,
+            macd_prev, macd, signal_prev, signal, rsi, boll_mid, boll_upper, vol_ma)
+
+
+# 条件位掩码 -> 优先级最高的信号（方案A > 方案B > 方案C）
+_MASK_TO_SIGNAL = (
+    SIGNAL_NONE, SIGNAL_BOLL_PULLBACK, SIGNAL_MACD_CROSS, SIGNAL_BOLL_PULLBACK,
+    SIGNAL_BOLL_BREAKOUT, SIGNAL_BOLL_PULLBACK, SIGNAL_MACD_CROSS, SIGNAL_BOLL_PULLBACK,
+)
+
+
+@njit(cache=True)
+def evaluate(close, volume, ema20_3, ema20_2, ema20, ema50, ema200,
+             macd_prev, macd, signal_prev, signal, rsi, boll_mid, boll_upper, vol_ma):
+    """
+    按DetailedStrategy的买入逻辑判断信号
+
+    各条件只计算一次，三个方案的结果编码为位掩码后查表取优先级最高者，
+    不再逐个方案分支判断。
+
+    Returns:
+        信号编号（SIGNAL_*），无信号时为 SIGNAL_NONE
+    """
+    # TIER 1: 必须条件
+    tier1 = ((ema20 > ema50) & (ema50 > ema200) &
+             (ema20 > ema20_2) & (ema20_2 > ema20_3) &
+             (macd > 0) & (signal > 0))
+
+    # 各方案共用的条件
+    above_mid = close > boll_mid
+    rsi_mid = (40 <= rsi) & (rsi <= 60)
+    rsi_high = (50 <= rsi) & (rsi <= 70)
+
+    # TIER 2: 进场时机
+    # 方案A: BOLL中轨回调
+    plan_a = ((boll_mid * 0.995 <= close) & (close <= boll_mid * 1.005) &
+              rsi_mid & (volume >= vol_ma) & above_mid)
+    # 方案B: MACD金叉
+    plan_b = ((macd > signal) & (macd_prev <= signal_prev) &
+              rsi_high & (volume > vol_ma * 1.3) & above_mid)
+    # 方案C: BOLL突破
+    plan_c = ((close > boll_upper) & rsi_high &
+              (volume > vol_ma * 1.5) & (macd > 0))
+
+    mask = (int(plan_a) | (int(plan_b) << 1) | (int(plan_c) << 2)) * int(tier1)
+    return _MASK_TO_SIGNAL[mask]
+
+
+@njit(cache=True)
+def volume_ratio(volume, vol_ma):
+    """成交量与均量之比（均量为0时与NumPy除法结果一致）"""
+    if vol_ma != 0.0:
+        return volume / vol_ma
+    if volume > 0:
+        return np.inf
+    return np.nan
+
+
+@njit(cache=True)
+def detect(close, volume):
+    """
+    由完整K线数组计算指标并判断信号
+
+    Returns:
+        (信号编号, ema20, ema50, rsi, 成交量比)
+    """
+    values = indicators(close, volume)
+    signal_id = evaluate(*values)
+    return signal_id, values[4], values[5], values[11], volume_ratio(values[1], values[14])
@@ -4,9 +4,12 @@
 长桥API客户端 - 仅用于行情查询
 """
 import os
+import atexit
 import logging
 from datetime import datetime, timedelta
+from functools import lru_cache
 from longport.openapi import QuoteContext, Config
+import numpy as np
 import pandas as pd
 
 logger = logging.getLogger(__name__)
@@ -45,16 +48,35 @@ class LongPortClient:
         Returns:
             dict: 包含最新价格、成交量等信息
         """
+        quotes = self.get_quotes([symbol])
+        # 接口返回的代码可能带市场后缀（如 AAPL.US），单个查询时直接取唯一结果
+        quote = quotes.get(symbol) or next(iter(quotes.values()), None)
+        if quote is None:
+            logger.warning("无法获取 %s 的行情数据", symbol)
+            return None
+        return {**quote, 'symbol': symbol}
+    
+    def get_quotes(self, symbols):
+        """
+        批量获取实时行情（一次请求）
+        
+        Args:
+            symbols: 股票代码列表
+        
+        Returns:
+            dict: 接口返回的股票代码 -> 行情字典，获取失败的代码不包含在内
+        """
+        if not symbols:
+            return {}
         try:
-            # 获取实时行情
-            quotes = self.quote_ctx.quote([symbol])
-            if not quotes:
-                logger.warning(f"无法获取 {symbol} 的行情数据")
-                return None
-            
-            quote = quotes[0]
-            return {
-                'symbol': symbol,
+            quotes = self.quote_ctx.quote(list(symbols))
+        except Exception as e:
+            logger.error("获取 %s 行情失败: %s", ', '.join(symbols), e)
+            return {}
+        
+        return {
+            quote.symbol: {
+                'symbol': quote.symbol,
                 'last_price': float(quote.last_done),
                 'open': float(quote.open),
                 'high': float(quote.high),
@@ -63,9 +85,8 @@ class LongPortClient:
                 'timestamp': quote.timestamp,
                 'prev_close': float(quote.prev_close) if quote.prev_close else None
             }
-        except Exception as e:
-            logger.error(f"获取 {symbol} 行情失败: {str(e)}")
-            return None
+            for quote in quotes
+        }
     
     def get_candlesticks(self, symbol, period='day', count=300):
         """
@@ -97,31 +118,43 @@ class LongPortClient:
             )
             
             if not candlesticks:
-                logger.warning(f"无法获取 {symbol} 的K线数据")
+                logger.warning("无法获取 %s 的K线数据", symbol)
                 return None
             
-            # 转换为DataFrame
-            data = []
-            for candle in candlesticks:
-                data.append({
-                    'datetime': candle.timestamp,
-                    'open': float(candle.open),
-                    'high': float(candle.high),
-                    'low': float(candle.low),
-                    'close': float(candle.close),
-                    'volume': int(candle.volume)
-                })
-            
-            df = pd.DataFrame(data)
-            df['datetime'] = pd.to_datetime(df['datetime'])
-            df = df.set_index('datetime')
-            df = df.sort_index()
-            
-            logger.info(f"成功获取 {symbol} 的K线数据: {len(df)} 条")
+            # 单次遍历填充预分配的列数组，直接按列构造DataFrame
+            n = len(candlesticks)
+            opens = np.empty(n, dtype=np.float64)
+            highs = np.empty(n, dtype=np.float64)
+            lows = np.empty(n, dtype=np.float64)
+            closes = np.empty(n, dtype=np.float64)
+            volumes = np.empty(n, dtype=np.int64)
+            timestamps = np.empty(n, dtype='datetime64[ns]')
+            for i, candle in enumerate(candlesticks):
+                opens[i] = candle.open
+                highs[i] = candle.high
+                lows[i] = candle.low
+                closes[i] = candle.close
+                volumes[i] = candle.volume
+                timestamps[i] = candle.timestamp
+            
+            # SDK通常已按时间升序返回，仅在乱序时按时间重排各列
+            if n > 1 and not (timestamps[1:] >= timestamps[:-1]).all():
+                order = np.argsort(timestamps, kind='stable')
+                opens, highs, lows, closes, volumes, timestamps = (
+                    arr[order] for arr in (opens, highs, lows, closes, volumes, timestamps)
+                )
+            
+            df = pd.DataFrame(
+                {'open': opens, 'high': highs, 'low': lows, 'close': closes, 'volume': volumes},
+                index=pd.DatetimeIndex(timestamps, name='datetime'),
+                copy=False
+            )
+            
+            logger.info("成功获取 %s 的K线数据: %d 条", symbol, len(df))
             return df
             
         except Exception as e:
-            logger.error(f"获取 {symbol} K线失败: {str(e)}")
+            logger.error("获取 %s K线失败: %s", symbol, e)
             return None
     
     def get_trading_days(self, market='US', days=10):
@@ -200,3 +233,15 @@ class LongPortClient:
             # 长桥SDK会自动处理连接关闭
             logger.info("长桥API连接已关闭")
 
+
+@lru_cache(maxsize=None)
+def get_client():
+    """
+    获取进程内共享的长桥客户端
+    
+    QuoteContext 内部维护长连接，复用同一实例可避免每次重新建立连接；
+    初始化失败时抛出异常且不缓存，下次调用会重试。
+    """
+    client = LongPortClient()
+    atexit.register(client.close)
+    return client
@@ -1,6 +1,6 @@
-import time
 import os
 import logging
+from datetime import datetime
 from apscheduler.schedulers.blocking import BlockingScheduler
 from src.trader_engine import run_strategy
 from src.config import load_config
@@ -39,24 +39,21 @@ if __name__ == "__main__":
     logger.info(f"检查间隔: {CHECK_INTERVAL}秒")
     logger.info("="*60)
     
-    # 方式1：使用apscheduler进行精确的定时调度（适合每小时或每天运行）
-    # scheduler = BlockingScheduler()
-    # # 配置为每小时的0分时刻执行一次 (例如 1:00, 2:00)
-    # scheduler.add_job(job, 'cron', minute=0)
-    # logger.info("调度器已启动，将按时执行任务。")
-    # try:
-    #     scheduler.start()
-    # except (KeyboardInterrupt, SystemExit):
-    #     logger.info("服务已停止")
-
-    # 方式2：简单的循环，每隔N秒执行一次
-    # 更适合于需要高频轮询的场景
+    # 使用apscheduler按固定间隔调度：间隔按时钟对齐，不受任务耗时影响；
+    # 上一次检查未结束时不会重叠执行，错过的触发合并为一次
+    scheduler = BlockingScheduler()
+    scheduler.add_job(
+        job, 'interval',
+        seconds=CHECK_INTERVAL,
+        next_run_time=datetime.now(),  # 启动后立即执行一次
+        max_instances=1,
+        coalesce=True,
+        misfire_grace_time=max(1, CHECK_INTERVAL // 2)
+    )
+    logger.info("调度器已启动，将按时执行任务。")
     try:
-        while True:
-            job()
-            logger.info(f"等待 {CHECK_INTERVAL} 秒后执行下一次检查...")
-            time.sleep(CHECK_INTERVAL)
-    except KeyboardInterrupt:
+        scheduler.start()
+    except (KeyboardInterrupt, SystemExit):
         logger.info("收到停止信号，服务正在关闭...")
     except Exception as e:
         logger.error(f"服务异常退出: {str(e)}", exc_info=True)
@@ -4,14 +4,63 @@
 Telegram通知模块
 """
 import os
+import atexit
 import logging
+import threading
 from datetime import datetime
 from telegram import Bot
-from telegram.error import TelegramError
+from telegram.error import RetryAfter, TelegramError
+from telegram.request import HTTPXRequest
 import asyncio
 
+try:
+    import h2  # noqa: F401  httpx的HTTP/2支持
+    HAS_HTTP2 = True
+except ImportError:
+    HAS_HTTP2 = False
+
 logger = logging.getLogger(__name__)
 
+# 同步接口等待发送结果的超时时间（秒）
+SEND_TIMEOUT = 30
+
+# 批量发送：短时间内的多条消息合并为一条，避免触发Telegram限流（429）
+TELEGRAM_MAX_CHARS = 4096      # 单条消息长度上限
+BATCH_MAX_CHARS = 3500         # 合并后达到此长度即发送
+BATCH_FLUSH_INTERVAL = 0.5     # 首条消息入队后最多等待的秒数
+BATCH_SEPARATOR = '\n\n'
+
+# Bot底层httpx连接池：并发监控与批量报告同时发送时避免连接被丢弃
+CONNECTION_POOL_SIZE = 32
+CONNECT_TIMEOUT = 5
+READ_TIMEOUT = 10
+
+# 消息时间格式
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# 交易信号消息模板（format_map填充）
+SIGNAL_TEMPLATE = """
+{emoji} *交易信号* {emoji}
+
+📊 *股票*: `{symbol}`
+💡 *信号*: *{signal_type}*
+💰 *价格*: `${price:.2f}`
+⏰ *时间*: {ts}
+
+📈 *策略详情*:
+{details}
+⚠️ *注意*: 这只是信号提示，请自行判断后手动操作"""
+
+
+def now_timestamp():
+    """当前时间的消息格式字符串（同一批消息可共用）"""
+    return datetime.now().strftime(TIMESTAMP_FORMAT)
+
+
+def _format_value(value):
+    """策略详情的取值格式：浮点数保留两位小数"""
+    return f"{value:.2f}" if isinstance(value, float) else value
+
 
 class TelegramNotifier:
     """Telegram通知器"""
@@ -31,9 +80,90 @@ class TelegramNotifier:
             self.enabled = False
             return
         
-        self.bot = Bot(token=self.token)
+        # 常驻连接池（未安装h2时使用HTTP/1.1）
+        self._request = HTTPXRequest(
+            connection_pool_size=CONNECTION_POOL_SIZE,
+            connect_timeout=CONNECT_TIMEOUT,
+            read_timeout=READ_TIMEOUT,
+            http_version='2' if HAS_HTTP2 else '1.1',
+        )
+        self.bot = Bot(token=self.token, request=self._request)
+        
+        # 在后台线程中运行常驻事件循环，所有发送复用同一个Bot及其连接池
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name='telegram-notifier', daemon=True
+        )
+        self._thread.start()
+        
+        # 批量发送队列及其消费协程（在事件循环内创建）
+        asyncio.run_coroutine_threadsafe(self._start_drainer(), self._loop).result(timeout=SEND_TIMEOUT)
+        atexit.register(self.close)
         logger.info("Telegram Bot初始化成功")
     
+    @property
+    def loop(self):
+        """通知器使用的常驻事件循环（未启用时为None）"""
+        loop = getattr(self, '_loop', None)
+        if loop is None or loop.is_closed():
+            return None
+        return loop
+    
+    async def _start_drainer(self):
+        """创建消息队列并启动批量发送协程"""
+        self._queue = asyncio.Queue()
+        self._drainer = asyncio.get_running_loop().create_task(self._drain())
+    
+    async def _drain(self):
+        """从队列取出消息，合并后批量发送"""
+        loop = asyncio.get_running_loop()
+        pending = None  # 超出长度、留给下一批的消息
+        
+        while True:
+            first = pending if pending is not None else await self._queue.get()
+            pending = None
+            batch = [first]
+            size = len(first)
+            deadline = loop.time() + BATCH_FLUSH_INTERVAL
+            
+            while size < BATCH_MAX_CHARS:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    message = await asyncio.wait_for(self._queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                if size + len(BATCH_SEPARATOR) + len(message) > TELEGRAM_MAX_CHARS:
+                    pending = message
+                    break
+                batch.append(message)
+                size += len(BATCH_SEPARATOR) + len(message)
+            
+            try:
+                sent = await self._send_with_retry(BATCH_SEPARATOR.join(batch))
+                if not sent and len(batch) > 1:
+                    # 合并消息被拒（如某条消息的Markdown格式错误），逐条重发，只丢失出错的那条
+                    logger.warning("批量消息发送失败，改为逐条发送 %d 条消息", len(batch))
+                    for message in batch:
+                        await self._send_with_retry(message)
+            except Exception as e:
+                logger.error(f"批量发送Telegram消息时出错: {str(e)}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+    
+    async def _send_with_retry(self, message, parse_mode='Markdown'):
+        """发送消息，遇到限流时按 retry_after 暂停后重试"""
+        while True:
+            try:
+                return await self._send_message_async(message, parse_mode)
+            except RetryAfter as e:
+                retry_after = e.retry_after
+                delay = retry_after.total_seconds() if hasattr(retry_after, 'total_seconds') else retry_after
+                logger.warning(f"Telegram限流，{delay}秒后重试")
+                await asyncio.sleep(delay)
+    
     async def _send_message_async(self, message, parse_mode='Markdown'):
         """异步发送消息"""
         try:
@@ -44,6 +174,8 @@ class TelegramNotifier:
             )
             logger.info("Telegram消息发送成功")
             return True
+        except RetryAfter:
+            raise
         except TelegramError as e:
             logger.error(f"Telegram消息发送失败: {str(e)}")
             return False
@@ -64,50 +196,114 @@ class TelegramNotifier:
             return False
         
         try:
-            # 在新的事件循环中运行异步函数
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            result = loop.run_until_complete(self._send_message_async(message, parse_mode))
-            loop.close()
-            return result
+            # 提交到常驻事件循环并等待结果
+            future = asyncio.run_coroutine_threadsafe(
+                self._send_with_retry(message, parse_mode), self._loop
+            )
+            return future.result(timeout=SEND_TIMEOUT)
         except Exception as e:
             logger.error(f"发送Telegram消息时出错: {str(e)}")
             return False
     
-    def send_signal(self, symbol, signal_type, price, strategy_info):
+    def enqueue_message(self, message):
+        """
+        将消息加入批量发送队列（不等待发送结果）
+        
+        Args:
+            message: 消息内容
+        
+        Returns:
+            bool: 是否已加入队列
+        """
+        if not self.enabled:
+            logger.debug("Telegram通知已禁用，跳过发送")
+            return False
+        
+        try:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, message)
+        except RuntimeError as e:
+            # 事件循环已关闭
+            logger.error(f"Telegram消息入队失败: {str(e)}")
+            return False
+        return True
+    
+    def flush(self, timeout=SEND_TIMEOUT):
+        """等待队列中的消息全部发送完毕"""
+        if not self.enabled or self._loop.is_closed():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._queue.join(), self._loop).result(timeout=timeout)
+        except Exception as e:
+            logger.error(f"等待Telegram消息发送时出错: {str(e)}")
+    
+    async def _stop_drainer(self):
+        """取消批量发送协程并关闭连接池"""
+        self._drainer.cancel()
+        try:
+            await self._drainer
+        except asyncio.CancelledError:
+            pass
+        await self._request.shutdown()
+    
+    def close(self):
+        """发送剩余消息并停止后台事件循环"""
+        if not getattr(self, '_loop', None) or self._loop.is_closed():
+            return
+        self.flush()
+        asyncio.run_coroutine_threadsafe(self._stop_drainer(), self._loop).result(timeout=SEND_TIMEOUT)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=SEND_TIMEOUT)
+        self._loop.close()
+    
+    @staticmethod
+    def format_signal(symbol, signal_type, price, strategy_info, timestamp=None):
         """
-        发送交易信号通知
+        生成交易信号消息
         
         Args:
             symbol: 股票代码
             signal_type: 信号类型 ('BUY', 'SELL')
             price: 当前价格
             strategy_info: 策略信息字典
+            timestamp: 消息时间（默认当前时间），同一批信号可传入同一个值
+        
+        Returns:
+            str: Markdown消息内容
         """
-        emoji = "🟢" if signal_type == "BUY" else "🔴"
+        details = "".join(
+            f"  • {key}: `{_format_value(value)}`\n" for key, value in (strategy_info or {}).items()
+        )
+        return SIGNAL_TEMPLATE.format_map({
+            'emoji': "🟢" if signal_type == "BUY" else "🔴",
+            'symbol': symbol,
+            'signal_type': signal_type,
+            'price': price,
+            'ts': timestamp or now_timestamp(),
+            'details': details,
+        })
+    
+    def send_signal(self, symbol, signal_type, price, strategy_info, timestamp=None):
+        """
+        发送交易信号通知（等待发送结果）
         
-        message = f"""
-{emoji} *交易信号* {emoji}
-
-📊 *股票*: `{symbol}`
-💡 *信号*: *{signal_type}*
-💰 *价格*: `${price:.2f}`
-⏰ *时间*: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-
-📈 *策略详情*:
-"""
+        参数同 format_signal。
         
-        # 添加策略信息
-        if strategy_info:
-            for key, value in strategy_info.items():
-                if isinstance(value, float):
-                    message += f"  • {key}: `{value:.2f}`\n"
-                else:
-                    message += f"  • {key}: `{value}`\n"
+        Returns:
+            bool: 是否发送成功
+        """
+        return self.send_message(self.format_signal(symbol, signal_type, price, strategy_info, timestamp))
+    
+    def send_signal_nowait(self, symbol, signal_type, price, strategy_info, timestamp=None):
+        """
+        发送交易信号通知（立即返回）
         
-        message += "\n⚠️ *注意*: 这只是信号提示，请自行判断后手动操作"
+        消息放入批量发送队列，由后台协程负责发送、限流重试，
+        调用方不等待Telegram的网络往返。参数同 format_signal。
         
-        return self.send_message(message)
+        Returns:
+            bool: 是否已加入队列
+        """
+        return self.enqueue_message(self.format_signal(symbol, signal_type, price, strategy_info, timestamp))
     
     def send_error(self, error_message):
         """
@@ -121,21 +317,22 @@ class TelegramNotifier:
 
 {error_message}
 
-⏰ 时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+⏰ 时间: {now_timestamp()}
 """
-        return self.send_message(message)
+        return self.enqueue_message(message)
     
-    def send_daily_report(self, report_data):
+    def send_daily_report(self, report_data, timestamp=None):
         """
         发送每日报告
         
         Args:
             report_data: 报告数据字典
+            timestamp: 报告时间（默认当前时间）
         """
         message = f"""
 📊 *每日监控报告*
 
-⏰ 时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+⏰ 时间: {timestamp or now_timestamp()}
 
 监控股票数: {report_data.get('total_stocks', 0)}
 发现信号数: {report_data.get('signals_found', 0)}
@@ -148,7 +345,7 @@ class TelegramNotifier:
         else:
             message += "\n✅ 今日无信号"
         
-        return self.send_message(message)
+        return self.enqueue_message(message)
     
     def send_startup(self):
         """发送启动通知"""
@@ -157,7 +354,7 @@ class TelegramNotifier:
 
 系统已启动，开始监控交易信号...
 
-⏰ 启动时间: """ + datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+⏰ 启动时间: """ + now_timestamp()
         
         return self.send_message(message)
 
@@ -5,25 +5,38 @@
 """
 import os
 import sys
+import copy
 import pandas as pd
 import numpy as np
 import json
+import queue
+import atexit
 import logging
-import time
-import schedule
+import logging.handlers
+import asyncio
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
 from pathlib import Path
 from dotenv import load_dotenv
 
-# 配置日志
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('/app/logs/trader_engine.log'),
-        logging.StreamHandler()
-    ]
-)
+# 配置日志：业务线程只把日志记录放入队列，由后台监听线程格式化并写入文件/控制台
+_log_formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+_log_handlers = [
+    logging.FileHandler('/app/logs/trader_engine.log'),
+    logging.StreamHandler()
+]
+for _handler in _log_handlers:
+    _handler.setFormatter(_log_formatter)
+_log_queue = queue.Queue(-1)
+_log_listener = logging.handlers.QueueListener(_log_queue, *_log_handlers, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+logging.root.setLevel(logging.INFO)
+logging.root.addHandler(logging.handlers.QueueHandler(_log_queue))
 logger = logging.getLogger(__name__)
 
 # 添加common_strategies路径
@@ -32,11 +45,16 @@ common_strategies_path = os.path.join(os.path.dirname(os.path.dirname(current_di
 sys.path.insert(0, common_strategies_path)
 
 from strategies.detailed_strategy import DetailedStrategy
+from src.detailed_kernel import (
+    ALPHA_EMA, BOLL_PERIOD, EMA_SPANS, MACD_SIGNAL_SPAN, MIN_BARS, RSI_PERIOD, VOL_MA_PERIOD,
+    SIGNAL_BOLL_BREAKOUT, SIGNAL_BOLL_PULLBACK, SIGNAL_MACD_CROSS, SIGNAL_NONE,
+    detect, evaluate, volume_ratio,
+)
 
 # 导入新模块
 try:
-    from src.longport_client import LongPortClient
-    from src.telegram_notifier import TelegramNotifier
+    from src.longport_client import get_client
+    from src.telegram_notifier import TelegramNotifier, now_timestamp
     HAS_LONGPORT = True
 except ImportError:
     logger.warning("长桥SDK未安装，将使用yfinance作为后备")
@@ -47,11 +65,24 @@ except ImportError:
 WATCHLIST = os.getenv('WATCHLIST', 'AAPL,00700.HK').split(',')
 WATCHLIST = [symbol.strip() for symbol in WATCHLIST]
 
-# 数据缓存
+# 数据缓存（symbol -> CandleBuffer）
 STOCK_DATA = {}
+INDICATOR_STATE = {}
 LAST_SIGNALS = {}
 MAX_HISTORY = 300
 
+# 保护 STOCK_DATA / INDICATOR_STATE 的并发写入
+_STATE_LOCK = threading.Lock()
+
+# 并发监控的最大线程数
+MAX_MONITOR_WORKERS = 16
+
+# K线数据磁盘缓存目录（进程重启后只需增量获取）
+STOCK_CACHE_DIR = os.getenv(
+    'STOCK_CACHE_DIR',
+    '/app/cache' if os.path.exists('/app') else os.path.join(os.path.dirname(current_dir), 'cache')
+)
+
 # 全局客户端
 longport_client = None
 telegram_notifier = None
@@ -67,7 +98,7 @@ def initialize_clients():
     # 初始化长桥客户端
     if HAS_LONGPORT:
         try:
-            longport_client = LongPortClient()
+            longport_client = get_client()
             logger.info("长桥API客户端初始化成功")
         except Exception as e:
             logger.error(f"长桥API初始化失败: {str(e)}")
@@ -94,17 +125,17 @@ def fetch_stock_data(symbol, days=300):
             # 使用长桥API
             df = longport_client.get_candlesticks(symbol, period='day', count=days)
             if df is not None and len(df) > 0:
-                logger.info(f"使用长桥API获取 {symbol} 数据成功: {len(df)} 条")
+                logger.info("使用长桥API获取 %s 数据成功: %d 条", symbol, len(df))
                 return df
         
         # 后备：使用yfinance
-        logger.info(f"使用yfinance获取 {symbol} 数据")
+        logger.info("使用yfinance获取 %s 数据", symbol)
         import yfinance as yf
         ticker = yf.Ticker(symbol)
         df = ticker.history(period=f"{days}d")
         
         if df.empty:
-            logger.warning(f"无法获取 {symbol} 的数据")
+            logger.warning("无法获取 %s 的数据", symbol)
             return None
         
         # 标准化列名
@@ -112,206 +143,517 @@ def fetch_stock_data(symbol, days=300):
         if 'close' in df.columns:
             df = df[['open', 'high', 'low', 'close', 'volume']]
         
-        logger.info(f"获取 {symbol} 数据成功: {len(df)} 条")
+        logger.info("获取 %s 数据成功: %d 条", symbol, len(df))
         return df
         
     except Exception as e:
-        logger.error(f"获取 {symbol} 数据失败: {str(e)}")
+        logger.error("获取 %s 数据失败: %s", symbol, e)
+        return None
+
+
+def _cache_path(symbol):
+    """股票K线缓存文件路径"""
+    return os.path.join(STOCK_CACHE_DIR, f"{symbol}.pkl")
+
+
+def load_cached_data(symbol):
+    """从磁盘缓存加载K线数据，不存在或损坏时返回None"""
+    try:
+        return pd.read_pickle(_cache_path(symbol))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.warning("读取 %s 缓存失败: %s", symbol, e)
         return None
 
 
-def calculate_rsi(prices, period=14):
-    """计算RSI"""
-    delta = prices.diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=period).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=period).mean()
-    rs = gain / loss
-    rsi = 100 - (100 / (1 + rs))
-    return rsi
+def save_cached_data(symbol, df):
+    """将K线数据写入磁盘缓存（先写临时文件再替换）"""
+    path = _cache_path(symbol)
+    tmp_path = path + '.tmp'
+    try:
+        os.makedirs(STOCK_CACHE_DIR, exist_ok=True)
+        df.to_pickle(tmp_path)
+        os.replace(tmp_path, path)
+    except Exception as e:
+        logger.warning("写入 %s 缓存失败: %s", symbol, e)
+
+
+def _bars_to_fetch(last_ts):
+    """
+    增量更新需要请求的K线数量
+    
+    按最新K线之后的交易日数计算，并多取一根以覆盖最新K线的修正；
+    最新K线之后没有新交易日且已不是当天时返回0（无需请求）。
+    """
+    last_date = pd.Timestamp(last_ts).date()
+    today = datetime.now().date()
+    new_bars = max(0, int(np.busday_count(last_date + timedelta(days=1), today + timedelta(days=1))))
+    if new_bars == 0 and last_date < today:
+        return 0
+    return min(new_bars + 1, MAX_HISTORY)
+
+
+def calculate_rsi(close, period=RSI_PERIOD):
+    """
+    计算最新RSI（最近 period 个涨跌幅的简单均值）
+    
+    Args:
+        close: 收盘价数组
+        period: RSI周期
+    
+    Returns:
+        float: 最新RSI，数据不足时为NaN
+    """
+    close = np.asarray(close, dtype=np.float64)
+    if len(close) < period:
+        return float('nan')
+    # 第一根K线没有涨跌幅，按0计入窗口（与 pandas 版本一致）
+    delta = np.diff(close[-(period + 1):])
+    gain = np.float64(delta[delta > 0].sum() / period)
+    loss = np.float64(-delta[delta < 0].sum() / period)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rs = gain / loss
+    return float(100 - (100 / (1 + rs)))
+
+
+# 信号编号 -> (信号类型, 信号描述)
+SIGNAL_PLANS = {
+    SIGNAL_BOLL_PULLBACK: ('方案A: BOLL中轨回调', '温和上升路径'),
+    SIGNAL_MACD_CROSS: ('方案B: MACD金叉', '趋势加速突破'),
+    SIGNAL_BOLL_BREAKOUT: ('方案C: BOLL突破', '最强势突破'),
+}
+
+
+class CandleBuffer:
+    """
+    定长K线缓冲区
+    
+    按时间升序把OHLCV保存在预分配的NumPy数组中（最多 capacity 条）。
+    增量更新时覆盖已有时间戳的K线、在末尾追加更新的K线，满后整体左移，
+    不再每次 concat + 去重 + 排序 整个DataFrame。
+    """
+    
+    COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+    
+    def __init__(self, capacity=MAX_HISTORY, tz=None):
+        self.capacity = capacity
+        self.tz = tz
+        self.size = 0
+        self.ts = np.empty(capacity, dtype='datetime64[ns]')
+        self.data = {col: np.empty(capacity, dtype=np.float64) for col in self.COLUMNS}
+    
+    @classmethod
+    def from_frame(cls, df, capacity=MAX_HISTORY):
+        """由DataFrame构建缓冲区（保留最近 capacity 条）"""
+        df = df.sort_index().tail(capacity)
+        buffer = cls(capacity, getattr(df.index, 'tz', None))
+        n = len(df)
+        buffer.ts[:n] = cls._index_values(df.index)
+        for col in cls.COLUMNS:
+            if col in df.columns:
+                buffer.data[col][:n] = df[col].to_numpy(dtype=np.float64)
+            else:
+                buffer.data[col][:n] = np.nan
+        buffer.size = n
+        return buffer
+    
+    @staticmethod
+    def _index_values(index):
+        """时间索引转为 datetime64[ns]（带时区的按UTC保存）"""
+        index = pd.DatetimeIndex(index)
+        if index.tz is not None:
+            index = index.tz_convert('UTC').tz_localize(None)
+        return index.values.astype('datetime64[ns]')
+    
+    def __len__(self):
+        return self.size
+    
+    def __getitem__(self, column):
+        """返回某列的有效数据视图"""
+        return self.data[column][:self.size]
+    
+    @property
+    def last_ts(self):
+        """最新K线的时间戳"""
+        return self.index[-1]
+    
+    @property
+    def index(self):
+        """有效数据的时间索引"""
+        index = pd.DatetimeIndex(self.ts[:self.size], name='datetime')
+        if self.tz is not None:
+            index = index.tz_localize('UTC').tz_convert(self.tz)
+        return index
+    
+    def update(self, new_df):
+        """
+        合并新K线：覆盖已有时间戳、追加更新的时间戳
+        
+        Returns:
+            bool: False 表示新数据中有早于最新K线且不在缓冲区中的时间戳，
+                  需要调用方用完整数据重建
+        """
+        new_ts = self._index_values(new_df.index)
+        order = np.argsort(new_ts, kind='stable')
+        new_ts = new_ts[order]
+        new_cols = {
+            col: new_df[col].to_numpy(dtype=np.float64)[order] if col in new_df.columns
+            else np.full(len(new_ts), np.nan)
+            for col in self.COLUMNS
+        }
+        
+        ts = self.ts[:self.size]
+        pos = np.searchsorted(ts, new_ts)
+        if self.size:
+            exists = (pos < self.size) & (ts[np.minimum(pos, self.size - 1)] == new_ts)
+        else:
+            exists = np.zeros(len(new_ts), dtype=bool)
+        newer = pos == self.size
+        if not (exists | newer).all():
+            return False
+        
+        # 覆盖已有K线
+        if exists.any():
+            for col in self.COLUMNS:
+                self.data[col][pos[exists]] = new_cols[col][exists]
+        
+        # 追加更新的K线（同一时间戳重复出现时保留最后一条）
+        if newer.any():
+            append_ts = new_ts[newer]
+            keep = np.append(append_ts[1:] != append_ts[:-1], True)
+            append_ts = append_ts[keep][-self.capacity:]
+            count = len(append_ts)
+            overflow = max(0, self.size + count - self.capacity)
+            if overflow:
+                self.ts[:self.size - overflow] = self.ts[overflow:self.size]
+                for col in self.COLUMNS:
+                    arr = self.data[col]
+                    arr[:self.size - overflow] = arr[overflow:self.size]
+                self.size -= overflow
+            self.ts[self.size:self.size + count] = append_ts
+            for col in self.COLUMNS:
+                self.data[col][self.size:self.size + count] = new_cols[col][newer][keep][-self.capacity:]
+            self.size += count
+        return True
+    
+    def to_frame(self):
+        """转换为DataFrame（用于缓存落盘和日志查看）"""
+        return pd.DataFrame(
+            {col: self[col].copy() for col in self.COLUMNS},
+            index=self.index
+        )
+
+
+@dataclass
+class IndicatorState:
+    """
+    单只股票的增量指标状态
+    
+    每根新K线以O(1)更新EMA、MACD、RSI、布林带和成交量均线，
+    不必每次对整个历史窗口重新计算。最新一根K线可能在盘中被修正，
+    因此保留其之前的状态快照，同一时间戳的K线再次到达时回滚后重算。
+    """
+    count: int = 0
+    last_ts: Any = None
+    last_close: float = float('nan')
+    last_volume: float = float('nan')
+    ema: Dict[int, float] = field(default_factory=dict)
+    ema20_hist: deque = field(default_factory=lambda: deque(maxlen=3))
+    macd_hist: deque = field(default_factory=lambda: deque(maxlen=2))
+    signal_hist: deque = field(default_factory=lambda: deque(maxlen=2))
+    gains: deque = field(default_factory=lambda: deque(maxlen=RSI_PERIOD))
+    losses: deque = field(default_factory=lambda: deque(maxlen=RSI_PERIOD))
+    gain_sum: float = 0.0
+    loss_sum: float = 0.0
+    closes: deque = field(default_factory=lambda: deque(maxlen=BOLL_PERIOD))
+    close_sum: float = 0.0
+    close_sumsq: float = 0.0
+    volumes: deque = field(default_factory=lambda: deque(maxlen=VOL_MA_PERIOD))
+    volume_sum: float = 0.0
+    _previous: Optional['IndicatorState'] = field(default=None, repr=False)
+    
+    @classmethod
+    def from_frame(cls, data_df):
+        """由完整K线数据（DataFrame 或 CandleBuffer）构建状态"""
+        state = cls()
+        state.update(data_df)
+        return state
+    
+    def update(self, data_df):
+        """
+        追加新K线（或修正最新一根K线）
+        
+        Returns:
+            bool: False 表示无法回滚最新K线，需要用完整数据重建状态
+        """
+        timestamps = data_df.index
+        closes = np.asarray(data_df['close'], dtype=np.float64).tolist()
+        volumes = np.asarray(data_df['volume'], dtype=np.float64).tolist()
+        last = len(closes) - 1
+        
+        for i, ts in enumerate(timestamps):
+            # 早于最新K线的历史数据视为已定稿，直接跳过
+            if self.last_ts is not None and ts < self.last_ts:
+                continue
+            if self.last_ts is not None and ts == self.last_ts:
+                if self._previous is None:
+                    return False
+                self._restore(self._previous)
+            # 只为最后一根K线保留快照
+            self._push(ts, closes[i], volumes[i], keep_previous=(i == last))
+        return True
+    
+    def _restore(self, previous):
+        """回滚到 previous 快照"""
+        self.__dict__.update(copy.deepcopy(previous.__dict__))
+    
+    @staticmethod
+    def _roll(window, value, total):
+        """向定长窗口追加值并返回更新后的窗口和"""
+        if len(window) == window.maxlen:
+            total -= window[0]
+        window.append(value)
+        return total + value
+    
+    def _push(self, ts, close, volume, keep_previous=False):
+        """更新一根K线"""
+        if keep_previous:
+            self._previous = None
+            self._previous = copy.deepcopy(self)
+        
+        # EMA（adjust=False，以第一根K线的收盘价为初始值）
+        if self.count == 0:
+            for span in EMA_SPANS:
+                self.ema[span] = close
+        else:
+            for span in EMA_SPANS:
+                alpha = ALPHA_EMA[span]
+                self.ema[span] = alpha * close + (1.0 - alpha) * self.ema[span]
+        self.ema20_hist.append(self.ema[20])
+        
+        # MACD
+        macd = self.ema[12] - self.ema[26]
+        if self.signal_hist:
+            alpha = ALPHA_EMA[MACD_SIGNAL_SPAN]
+            signal = alpha * macd + (1.0 - alpha) * self.signal_hist[-1]
+        else:
+            signal = macd
+        self.macd_hist.append(macd)
+        self.signal_hist.append(signal)
+        
+        # RSI（与 calculate_rsi 一致，使用简单滚动均值）
+        delta = close - self.last_close if self.count else 0.0
+        self.gain_sum = self._roll(self.gains, delta if delta > 0 else 0.0, self.gain_sum)
+        self.loss_sum = self._roll(self.losses, -delta if delta < 0 else 0.0, self.loss_sum)
+        
+        # 布林带与成交量均线
+        self.close_sumsq = self._roll_sq(close)
+        self.close_sum = self._roll(self.closes, close, self.close_sum)
+        self.volume_sum = self._roll(self.volumes, volume, self.volume_sum)
+        
+        self.count += 1
+        self.last_ts = ts
+        self.last_close = close
+        self.last_volume = volume
+    
+    def _roll_sq(self, close):
+        """更新收盘价平方和（须在 closes 窗口追加新值之前调用）"""
+        total = self.close_sumsq
+        if len(self.closes) == self.closes.maxlen:
+            total -= self.closes[0] ** 2
+        return total + close * close
+    
+    def latest(self):
+        """返回与 detailed_kernel.indicators 相同顺序的最新指标值元组"""
+        n = len(self.closes)
+        mean = self.close_sum / n
+        variance = max((self.close_sumsq - n * mean * mean) / (n - 1), 0.0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = np.float64(self.gain_sum / RSI_PERIOD) / np.float64(self.loss_sum / RSI_PERIOD)
+        return (
+            self.last_close, self.last_volume,
+            *self.ema20_hist, self.ema[50], self.ema[200],
+            *self.macd_hist, *self.signal_hist,
+            float(100 - (100 / (1 + rs))),
+            mean, mean + 2 * variance ** 0.5,
+            self.volume_sum / len(self.volumes),
+        )
 
 
-def check_buy_signals(symbol, data_df):
+def check_buy_signals(symbol, data_df, state=None):
     """
     根据DetailedStrategy的买入逻辑检查买入信号
     
     Args:
         symbol: 股票代码
-        data_df: pandas DataFrame包含OHLCV数据
+        data_df: 包含OHLCV数据的 DataFrame 或 CandleBuffer
+        state: 该股票的 IndicatorState，提供时直接读取增量指标
     
     Returns:
         买入信号描述，如果没有信号则返回None
     """
-    if len(data_df) < 200:  # 需要至少200个数据点来计算EMA200
-        return None
+    if state is not None:
+        if state.count < MIN_BARS:  # 需要至少200个数据点来计算EMA200
+            return None
+        values = state.latest()
+        signal_id = evaluate(*values)
+        ema20, ema50, rsi = values[4], values[5], values[11]
+        ratio = volume_ratio(values[1], values[14])
+    else:
+        if len(data_df) < MIN_BARS:
+            return None
+        close = np.ascontiguousarray(data_df['close'], dtype=np.float64)
+        volume = np.ascontiguousarray(data_df['volume'], dtype=np.float64)
+        signal_id, ema20, ema50, rsi, ratio = detect(close, volume)
     
-    # 计算技术指标
-    close = data_df['close'].values
-    volume = data_df['volume'].values
-    
-    # EMA
-    ema_20 = pd.Series(close).ewm(span=20, adjust=False).mean().values
-    ema_50 = pd.Series(close).ewm(span=50, adjust=False).mean().values
-    ema_200 = pd.Series(close).ewm(span=200, adjust=False).mean().values
-    
-    # MACD
-    exp1 = pd.Series(close).ewm(span=12, adjust=False).mean()
-    exp2 = pd.Series(close).ewm(span=26, adjust=False).mean()
-    macd_line = (exp1 - exp2).values
-    macd_signal = pd.Series(macd_line).ewm(span=9, adjust=False).mean().values
-    
-    # RSI
-    rsi = calculate_rsi(pd.Series(close), 14).values
-    
-    # Bollinger Bands
-    sma_20 = pd.Series(close).rolling(window=20).mean()
-    std_20 = pd.Series(close).rolling(window=20).std()
-    boll_upper = (sma_20 + 2 * std_20).values
-    boll_mid = sma_20.values
-    boll_lower = (sma_20 - 2 * std_20).values
-    
-    # 成交量均线
-    vol_ma_20 = pd.Series(volume).rolling(window=20).mean().values
-    
-    # TIER 1: 检查必须条件
-    current_close = close[-1]
-    is_ema_golden = (ema_20[-1] > ema_50[-1]) and (ema_50[-1] > ema_200[-1])
-    is_ema20_rising = (ema_20[-1] > ema_20[-2]) and (ema_20[-2] > ema_20[-3])
-    is_macd_positive = macd_line[-1] > 0 and macd_signal[-1] > 0
-    
-    if not (is_ema_golden and is_ema20_rising and is_macd_positive):
+    if signal_id == SIGNAL_NONE:
         return None
     
-    # TIER 2: 检查进场时机
-    current_rsi = rsi[-1]
-    current_volume = volume[-1]
-    
-    # 方案A: BOLL中轨回调
-    if (boll_mid[-1] * 0.995 <= current_close <= boll_mid[-1] * 1.005 and
-        40 <= current_rsi <= 60 and
-        current_volume >= vol_ma_20[-1] and
-        current_close > boll_mid[-1]):
-        return {
-            'type': '方案A: BOLL中轨回调',
-            'description': '温和上升路径',
-            'ema20': ema_20[-1],
-            'ema50': ema_50[-1],
-            'rsi': current_rsi,
-            'volume_ratio': current_volume / vol_ma_20[-1]
-        }
-    
-    # 方案B: MACD金叉
-    if (macd_line[-1] > macd_signal[-1] and macd_line[-2] <= macd_signal[-2] and
-        50 <= current_rsi <= 70 and
-        current_volume > vol_ma_20[-1] * 1.3 and
-        current_close > boll_mid[-1]):
-        return {
-            'type': '方案B: MACD金叉',
-            'description': '趋势加速突破',
-            'ema20': ema_20[-1],
-            'ema50': ema_50[-1],
-            'rsi': current_rsi,
-            'volume_ratio': current_volume / vol_ma_20[-1]
-        }
+    signal_type, description = SIGNAL_PLANS[signal_id]
+    return {
+        'type': signal_type,
+        'description': description,
+        'ema20': ema20,
+        'ema50': ema50,
+        'rsi': rsi,
+        'volume_ratio': ratio
+    }
+
+
+def _process_symbol(symbol):
+    """
+    获取单只股票的最新数据并检查买入信号（在线程池中运行）
     
-    # 方案C: BOLL突破
-    if (current_close > boll_upper[-1] and
-        50 <= current_rsi <= 70 and
-        current_volume > vol_ma_20[-1] * 1.5 and
-        macd_line[-1] > 0):
-        return {
-            'type': '方案C: BOLL突破',
-            'description': '最强势突破',
-            'ema20': ema_20[-1],
-            'ema50': ema_50[-1],
-            'rsi': current_rsi,
-            'volume_ratio': current_volume / vol_ma_20[-1]
-        }
+    Args:
+        symbol: 股票代码
     
-    return None
+    Returns:
+        (CandleBuffer, 买入信号) 元组；数据不足时返回None
+    """
+    logger.info("开始监控 %s", symbol)
+    
+    with _STATE_LOCK:
+        buffer = STOCK_DATA.get(symbol)
+        state = INDICATOR_STATE.get(symbol)
+    
+    # 内存中没有时从磁盘缓存恢复
+    if buffer is None:
+        cached = load_cached_data(symbol)
+        if cached is not None:
+            buffer = CandleBuffer.from_frame(cached)
+    
+    # 获取历史数据（如果缓存中没有或数据过旧）
+    if buffer is None or len(buffer) < 200:
+        df = fetch_stock_data(symbol, days=300)
+        if df is None or len(df) < 200:
+            logger.warning("%s 数据不足，跳过", symbol)
+            return None
+        buffer = CandleBuffer.from_frame(df)
+        state = IndicatorState.from_frame(df)
+        save_cached_data(symbol, df)
+    else:
+        # 只请求最新K线之后的数据
+        count = _bars_to_fetch(buffer.last_ts)
+        new_data = fetch_stock_data(symbol, days=count) if count else None
+        if new_data is not None:
+            # 原地合并新K线，无法合并时重建
+            if not buffer.update(new_data):
+                df = pd.concat([buffer.to_frame(), new_data])
+                df = df[~df.index.duplicated(keep='last')]
+                buffer = CandleBuffer.from_frame(df)
+                state = None
+            # 增量更新指标，无法增量时重建
+            if state is None or not state.update(new_data):
+                state = IndicatorState.from_frame(buffer)
+            save_cached_data(symbol, buffer.to_frame())
+        else:
+            if count == 0:
+                logger.info("%s 无新K线，跳过请求", symbol)
+            if state is None:
+                state = IndicatorState.from_frame(buffer)
+    
+    with _STATE_LOCK:
+        STOCK_DATA[symbol] = buffer
+        INDICATOR_STATE[symbol] = state
+    
+    # 检查买入信号
+    return buffer, check_buy_signals(symbol, buffer, state)
 
 
-def monitor_stocks():
+def monitor_stocks(timestamp=None):
     """
     监控股票并检查交易信号
+    
+    各股票的数据获取与指标计算在线程池中并发执行（网络等待相互重叠），
+    信号去重与通知在主线程中按监控列表顺序处理。
+    
+    Args:
+        timestamp: 本批通知共用的时间字符串（默认当前时间）
     """
+    timestamp = timestamp or now_timestamp()
     signals_found = []
+    max_workers = max(1, min(MAX_MONITOR_WORKERS, len(WATCHLIST)))
     
-    for symbol in WATCHLIST:
-        try:
-            logger.info(f"开始监控 {symbol}")
-            
-            # 获取历史数据（如果缓存中没有或数据过旧）
-            if symbol not in STOCK_DATA or len(STOCK_DATA[symbol]) < 200:
-                df = fetch_stock_data(symbol, days=300)
-                if df is None or len(df) < 200:
-                    logger.warning(f"{symbol} 数据不足，跳过")
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [(symbol, executor.submit(_process_symbol, symbol)) for symbol in WATCHLIST]
+        
+        for symbol, future in futures:
+            try:
+                result = future.result()
+                if result is None:
                     continue
-                STOCK_DATA[symbol] = df
-            else:
-                # 更新最新数据
-                new_data = fetch_stock_data(symbol, days=5)
-                if new_data is not None:
-                    # 合并数据，去重
-                    df = pd.concat([STOCK_DATA[symbol], new_data])
-                    df = df[~df.index.duplicated(keep='last')]
-                    df = df.sort_index()
-                    # 保留最近MAX_HISTORY条
-                    df = df.tail(MAX_HISTORY)
-                    STOCK_DATA[symbol] = df
-                else:
-                    df = STOCK_DATA[symbol]
-            
-            # 检查买入信号
-            buy_signal = check_buy_signals(symbol, df)
-            
-            if buy_signal:
-                current_price = df['close'].iloc[-1]
-                
-                # 检查是否是新信号（防止重复通知）
-                last_signal_type = LAST_SIGNALS.get(symbol, {}).get('type')
-                current_signal_type = buy_signal['type']
+                buffer, buy_signal = result
                 
-                if last_signal_type != current_signal_type:
-                    logger.info(f"🟢 发现买入信号: {symbol} @ {current_price:.2f} - {buy_signal['type']}")
+                if buy_signal:
+                    current_price = buffer['close'][-1]
                     
-                    # 构建策略信息
-                    strategy_info = {
-                        '信号类型': buy_signal['type'],
-                        '信号描述': buy_signal['description'],
-                        'EMA20': f"{buy_signal['ema20']:.2f}",
-                        'EMA50': f"{buy_signal['ema50']:.2f}",
-                        'RSI': f"{buy_signal['rsi']:.2f}",
-                        '成交量比': f"{buy_signal['volume_ratio']:.2f}x"
-                    }
+                    # 检查是否是新信号（防止重复通知）
+                    last_signal_type = (LAST_SIGNALS.get(symbol) or {}).get('type')
+                    current_signal_type = buy_signal['type']
                     
-                    # 发送Telegram通知
-                    if telegram_notifier and telegram_notifier.enabled:
-                        telegram_notifier.send_signal(
-                            symbol=symbol,
-                            signal_type='BUY',
-                            price=current_price,
-                            strategy_info=strategy_info
-                        )
-                    
-                    LAST_SIGNALS[symbol] = buy_signal
-                    signals_found.append({
-                        'symbol': symbol,
-                        'type': 'BUY',
-                        'price': current_price,
-                        'signal': buy_signal['type']
-                    })
+                    if last_signal_type != current_signal_type:
+                        logger.info("🟢 发现买入信号: %s @ %.2f - %s", symbol, current_price, buy_signal['type'])
+                        
+                        # 构建策略信息
+                        strategy_info = {
+                            '信号类型': buy_signal['type'],
+                            '信号描述': buy_signal['description'],
+                            'EMA20': f"{buy_signal['ema20']:.2f}",
+                            'EMA50': f"{buy_signal['ema50']:.2f}",
+                            'RSI': f"{buy_signal['rsi']:.2f}",
+                            '成交量比': f"{buy_signal['volume_ratio']:.2f}x"
+                        }
+                        
+                        # 发送Telegram通知（入队后立即返回，不阻塞后续股票）
+                        if telegram_notifier and telegram_notifier.enabled:
+                            telegram_notifier.send_signal_nowait(
+                                symbol=symbol,
+                                signal_type='BUY',
+                                price=current_price,
+                                strategy_info=strategy_info,
+                                timestamp=timestamp
+                            )
+                        
+                        LAST_SIGNALS[symbol] = buy_signal
+                        signals_found.append({
+                            'symbol': symbol,
+                            'type': 'BUY',
+                            'price': current_price,
+                            'signal': buy_signal['type']
+                        })
+                    else:
+                        logger.debug("%s 信号持续: %s", symbol, current_signal_type)
                 else:
-                    logger.debug(f"{symbol} 信号持续: {current_signal_type}")
-            else:
-                # 无信号，重置
-                if symbol in LAST_SIGNALS and LAST_SIGNALS[symbol]:
-                    logger.info(f"{symbol} 信号消失")
-                    LAST_SIGNALS[symbol] = None
-                
-        except Exception as e:
-            logger.error(f"监控 {symbol} 时出错: {str(e)}", exc_info=True)
-            if telegram_notifier and telegram_notifier.enabled:
-                telegram_notifier.send_error(f"监控 {symbol} 失败: {str(e)}")
+                    # 无信号，重置
+                    if symbol in LAST_SIGNALS and LAST_SIGNALS[symbol]:
+                        logger.info("%s 信号消失", symbol)
+                        LAST_SIGNALS[symbol] = None
+                    
+            except Exception as e:
+                logger.error("监控 %s 时出错: %s", symbol, e, exc_info=True)
+                if telegram_notifier and telegram_notifier.enabled:
+                    telegram_notifier.send_error(f"监控 {symbol} 失败: {str(e)}")
     
     return signals_found
 
@@ -319,10 +661,11 @@ def monitor_stocks():
 def scheduled_job():
     """定时任务"""
     logger.info("=" * 60)
-    logger.info(f"开始定时监控任务 - {datetime.now()}")
+    logger.info("开始定时监控任务 - %s", datetime.now())
     logger.info("=" * 60)
     
-    signals = monitor_stocks()
+    timestamp = now_timestamp()
+    signals = monitor_stocks(timestamp)
     
     # 发送每日报告
     if telegram_notifier and telegram_notifier.enabled:
@@ -331,13 +674,60 @@ def scheduled_job():
             'signals_found': len(signals),
             'signals': signals
         }
-        telegram_notifier.send_daily_report(report_data)
+        telegram_notifier.send_daily_report(report_data, timestamp)
     
     logger.info("=" * 60)
-    logger.info(f"监控任务完成 - 发现 {len(signals)} 个信号")
+    logger.info("监控任务完成 - 发现 %d 个信号", len(signals))
     logger.info("=" * 60)
 
 
+def _seconds_until(check_time):
+    """距离下一次 HH:MM 的秒数"""
+    hour, minute = (int(part) for part in check_time.split(':'))
+    now = datetime.now()
+    next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if next_run <= now:
+        next_run += timedelta(days=1)
+    return (next_run - now).total_seconds()
+
+
+def _log_job_result(task):
+    """记录后台监控任务的异常"""
+    if not task.cancelled() and task.exception() is not None:
+        logger.error(f"定时监控失败: {task.exception()}", exc_info=task.exception())
+
+
+async def run_daily(check_time):
+    """
+    每天 check_time 执行一次监控
+    
+    直接休眠到下一次执行时刻，不再每分钟唤醒检查；监控任务在线程中运行，
+    上一次尚未完成时跳过本次。
+    """
+    running = None
+    while True:
+        await asyncio.sleep(_seconds_until(check_time))
+        if running is not None and not running.done():
+            logger.warning("上一次监控尚未完成，跳过本次")
+            continue
+        running = asyncio.create_task(asyncio.to_thread(scheduled_job))
+        running.add_done_callback(_log_job_result)
+
+
+def run_scheduler(check_time):
+    """运行定时循环，启用Telegram时与通知器共用同一个事件循环"""
+    loop = telegram_notifier.loop if telegram_notifier else None
+    if loop is None:
+        asyncio.run(run_daily(check_time))
+        return
+    
+    future = asyncio.run_coroutine_threadsafe(run_daily(check_time), loop)
+    try:
+        future.result()
+    finally:
+        future.cancel()
+
+
 if __name__ == '__main__':
     # 加载环境变量
     load_dotenv()
@@ -365,9 +755,6 @@ if __name__ == '__main__':
     # 获取查询时间
     check_time = os.getenv('CHECK_TIME', '06:00')
     
-    # 设置定时任务
-    schedule.every().day.at(check_time).do(scheduled_job)
-    
     # 立即执行一次（测试）
     logger.info("执行首次监控（测试）...")
     try:
@@ -380,9 +767,7 @@ if __name__ == '__main__':
     logger.info("按 Ctrl+C 停止")
     
     try:
-        while True:
-            schedule.run_pending()
-            time.sleep(60)  # 每分钟检查一次定时任务
+        run_scheduler(check_time)
     except KeyboardInterrupt:
         logger.info("\n收到停止信号，系统关闭...")
         if longport_client:
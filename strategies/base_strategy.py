@@ -33,7 +33,8 @@ class BaseStrategy(ABC):
         处理每个K线数据
         
         Args:
-            bar: K线数据字典，包含 open, high, low, close, volume 等
+            bar: K线数据字典，包含 open, high, low, close, volume 等。
+                 回测引擎在每根K线间复用同一个字典，如需保存请复制。
         """
         pass
     
@@ -9,7 +9,11 @@
 创建日期: 2024-01-01
 """
 
-from typing import Dict, Any, Optional, List
+from collections import deque
+from typing import Deque, Dict, Any, Optional, Union
+
+import numpy as np
+
 from .base_strategy import BaseStrategy
 
 
@@ -24,6 +28,8 @@ class MACrossStrategy(BaseStrategy):
         fast_period (int): 快速均线周期，默认5
         slow_period (int): 慢速均线周期，默认20
         ma_type (str): 均线类型，'SMA' 或 'EMA'，默认 'SMA'
+        n_bars (int): 可选，K线总数；提供时均线历史预分配为定长数组，
+            否则只保留最近 slow_period + 2 个值
     
     信号逻辑:
         买入（金叉）: 快线从下方穿越慢线
@@ -33,6 +39,10 @@ class MACrossStrategy(BaseStrategy):
     # 策略名称
     name = "MA Cross Strategy"
     
+    # 回测引擎可用的编译内核（见 backtester/_engine_kernels.py）
+    # 引擎只使用类自身声明的内核，子类不会继承；交易逻辑未改动的子类可重新声明
+    numba_kernel = 'ma_cross'
+    
     def __init__(self, params: Optional[Dict[str, Any]] = None):
         """初始化策略"""
         super().__init__(params)
@@ -42,35 +52,82 @@ class MACrossStrategy(BaseStrategy):
         self.slow_period = self.params.get('slow_period', 20)
         self.ma_type = self.params.get('ma_type', 'SMA')
         
+        # 均线窗口及其滚动和（每根K线O(1)更新）
+        self._fast_window: Deque[float] = deque(maxlen=self.fast_period)
+        self._slow_window: Deque[float] = deque(maxlen=self.slow_period)
+        self._fast_sum = 0.0
+        self._slow_sum = 0.0
+        
         # 数据缓存
-        self.prices: List[float] = []
         self.fast_ma: Optional[float] = None
         self.slow_ma: Optional[float] = None
         self.prev_fast_ma: Optional[float] = None
         self.prev_slow_ma: Optional[float] = None
         
+        # 交叉判断状态：前后两根K线的均线都已算出后置为True，
+        # 快慢线的相对位置在 on_bar 中更新一次
+        self._seeded = False
+        self._above = False
+        self._below = False
+        self._prev_above = False
+        self._prev_below = False
+        
         # 用于EMA计算的平滑因子
         self.fast_multiplier = 2 / (self.fast_period + 1)
         self.slow_multiplier = 2 / (self.slow_period + 1)
         
-        # 指标历史记录（用于可视化）
-        self.fast_ma_history: List[Optional[float]] = []
-        self.slow_ma_history: List[Optional[float]] = []
+        # 指标历史记录（用于可视化，内存有上限）
+        self.n_bars = self.params.get('n_bars')
+        self._bar_index = 0
+        self.fast_ma_history: Union[np.ndarray, Deque[Optional[float]]] = self._new_history()
+        self.slow_ma_history: Union[np.ndarray, Deque[Optional[float]]] = self._new_history()
+    
+    def _new_history(self) -> Union[np.ndarray, Deque[Optional[float]]]:
+        """
+        创建均线历史容器
+        
+        已知K线数量时预分配NaN数组按索引写入；流式运行时交易判断只用到
+        当前与前一个均线值，使用定长deque。
+        """
+        if self.n_bars:
+            return np.full(int(self.n_bars), np.nan, dtype=np.float64)
+        return deque(maxlen=self.slow_period + 2)
+    
+    def _record_history(self) -> None:
+        """记录当前均线值"""
+        if isinstance(self.fast_ma_history, np.ndarray):
+            i = self._bar_index
+            if i < self.fast_ma_history.shape[0]:
+                # 数据不足时保持NaN
+                if self.fast_ma is not None:
+                    self.fast_ma_history[i] = self.fast_ma
+                if self.slow_ma is not None:
+                    self.slow_ma_history[i] = self.slow_ma
+        else:
+            self.fast_ma_history.append(self.fast_ma)
+            self.slow_ma_history.append(self.slow_ma)
+        self._bar_index += 1
     
-    def _calculate_sma(self, prices: List[float], period: int) -> Optional[float]:
-        """计算简单移动平均线"""
-        if len(prices) < period:
+    @staticmethod
+    def _roll(window: Deque[float], total: float, price: float) -> float:
+        """向定长窗口追加价格，返回更新后的窗口和"""
+        if len(window) == window.maxlen:
+            total -= window[0]
+        window.append(price)
+        return total + price
+    
+    def _calculate_sma(self, window: Deque[float], total: float) -> Optional[float]:
+        """计算简单移动平均线（window 未填满时返回None）"""
+        if len(window) < window.maxlen:
             return None
-        return sum(prices[-period:]) / period
+        return total / window.maxlen
     
     def _calculate_ema(self, current_price: float, prev_ema: Optional[float], 
-                       multiplier: float, period: int) -> Optional[float]:
+                       multiplier: float, window: Deque[float], total: float) -> Optional[float]:
         """计算指数移动平均线"""
         if prev_ema is None:
             # 第一次计算，使用SMA作为初始值
-            if len(self.prices) >= period:
-                return sum(self.prices[-period:]) / period
-            return None
+            return self._calculate_sma(window, total)
         return (current_price - prev_ema) * multiplier + prev_ema
     
     def on_bar(self, bar: Dict[str, Any]) -> None:
@@ -81,7 +138,8 @@ class MACrossStrategy(BaseStrategy):
             bar: K线数据，包含 open, high, low, close, volume, datetime
         """
         close = bar['close']
-        self.prices.append(close)
+        self._fast_sum = self._roll(self._fast_window, self._fast_sum, close)
+        self._slow_sum = self._roll(self._slow_window, self._slow_sum, close)
         
         # 保存前一个均线值
         self.prev_fast_ma = self.fast_ma
@@ -90,18 +148,29 @@ class MACrossStrategy(BaseStrategy):
         # 根据类型计算均线
         if self.ma_type == 'EMA':
             self.fast_ma = self._calculate_ema(
-                close, self.fast_ma, self.fast_multiplier, self.fast_period
+                close, self.fast_ma, self.fast_multiplier, self._fast_window, self._fast_sum
             )
             self.slow_ma = self._calculate_ema(
-                close, self.slow_ma, self.slow_multiplier, self.slow_period
+                close, self.slow_ma, self.slow_multiplier, self._slow_window, self._slow_sum
             )
         else:  # SMA
-            self.fast_ma = self._calculate_sma(self.prices, self.fast_period)
-            self.slow_ma = self._calculate_sma(self.prices, self.slow_period)
+            self.fast_ma = self._calculate_sma(self._fast_window, self._fast_sum)
+            self.slow_ma = self._calculate_sma(self._slow_window, self._slow_sum)
+        
+        # 更新快慢线相对位置
+        if self._seeded:
+            self._prev_above = self._above
+            self._prev_below = self._below
+        elif self.prev_fast_ma is not None and self.prev_slow_ma is not None:
+            self._seeded = True
+            self._prev_above = self.prev_fast_ma > self.prev_slow_ma
+            self._prev_below = self.prev_fast_ma < self.prev_slow_ma
+        if self.fast_ma is not None and self.slow_ma is not None:
+            self._above = self.fast_ma > self.slow_ma
+            self._below = self.fast_ma < self.slow_ma
         
         # 记录历史
-        self.fast_ma_history.append(self.fast_ma)
-        self.slow_ma_history.append(self.slow_ma)
+        self._record_history()
     
     def should_buy(self) -> bool:
         """
@@ -114,14 +183,11 @@ class MACrossStrategy(BaseStrategy):
         if self.position > 0:
             return False  # 已有持仓
         
-        if None in (self.fast_ma, self.slow_ma, self.prev_fast_ma, self.prev_slow_ma):
+        if not self._seeded:
             return False  # 数据不足
         
         # 金叉：快线从下方穿越慢线
-        was_below = self.prev_fast_ma <= self.prev_slow_ma
-        is_above = self.fast_ma > self.slow_ma
-        
-        return was_below and is_above
+        return self._above and not self._prev_above
     
     def should_sell(self) -> bool:
         """
@@ -134,14 +200,15 @@ class MACrossStrategy(BaseStrategy):
         if self.position <= 0:
             return False  # 无持仓
         
-        if None in (self.fast_ma, self.slow_ma, self.prev_fast_ma, self.prev_slow_ma):
+        if not self._seeded:
             return False  # 数据不足
         
         # 死叉：快线从上方穿越慢线
-        was_above = self.prev_fast_ma >= self.prev_slow_ma
-        is_below = self.fast_ma < self.slow_ma
-        
-        return was_above and is_below
+        return self._below and not self._prev_below
+    
+    def get_kernel_args(self) -> tuple:
+        """返回编译内核所需的标量参数"""
+        return (int(self.fast_period), int(self.slow_period), self.ma_type == 'EMA')
     
     def get_indicator_values(self) -> Dict[str, Any]:
         """
@@ -160,13 +227,22 @@ class MACrossStrategy(BaseStrategy):
     def reset(self) -> None:
         """重置策略状态"""
         super().reset()
-        self.prices = []
+        self._fast_window.clear()
+        self._slow_window.clear()
+        self._fast_sum = 0.0
+        self._slow_sum = 0.0
         self.fast_ma = None
         self.slow_ma = None
         self.prev_fast_ma = None
         self.prev_slow_ma = None
-        self.fast_ma_history = []
-        self.slow_ma_history = []
+        self._seeded = False
+        self._above = False
+        self._below = False
+        self._prev_above = False
+        self._prev_below = False
+        self._bar_index = 0
+        self.fast_ma_history = self._new_history()
+        self.slow_ma_history = self._new_history()
 
 
 # 策略元数据（用于策略发现和管理）
@@ -10,6 +10,7 @@
 创建日期: 2024-01-01
 """
 
+from collections import deque
 from typing import Dict, Any, Optional
 from .base_strategy import BaseStrategy
 
@@ -37,12 +38,20 @@ class TemplateStrategy(BaseStrategy):
         self.fast_period = self.params.get('fast_period', 10)
         self.slow_period = self.params.get('slow_period', 20)
         
+        # 均线窗口及其滚动和：每根K线只加入新价格、移出最旧价格
+        self.fast_window = deque(maxlen=self.fast_period)
+        self.slow_window = deque(maxlen=self.slow_period)
+        self.fast_sum = 0.0
+        self.slow_sum = 0.0
+        
         # 数据缓存
-        self.prices = []
         self.fast_ma = None
         self.slow_ma = None
         self.prev_fast_ma = None
         self.prev_slow_ma = None
+        
+        # 前后两根K线的均线都已算出后置为True
+        self._seeded = False
     
     def on_bar(self, bar: Dict[str, Any]) -> None:
         """
@@ -52,16 +61,29 @@ class TemplateStrategy(BaseStrategy):
             bar: K线数据，包含 open, high, low, close, volume
         """
         close = bar['close']
-        self.prices.append(close)
+        
+        # 更新滚动和（窗口已满时先减去将被移出的价格）
+        if len(self.fast_window) == self.fast_period:
+            self.fast_sum -= self.fast_window[0]
+        self.fast_window.append(close)
+        self.fast_sum += close
+        
+        if len(self.slow_window) == self.slow_period:
+            self.slow_sum -= self.slow_window[0]
+        self.slow_window.append(close)
+        self.slow_sum += close
         
         # 计算移动平均线
-        if len(self.prices) >= self.fast_period:
+        if len(self.fast_window) == self.fast_period:
             self.prev_fast_ma = self.fast_ma
-            self.fast_ma = sum(self.prices[-self.fast_period:]) / self.fast_period
+            self.fast_ma = self.fast_sum / self.fast_period
         
-        if len(self.prices) >= self.slow_period:
+        if len(self.slow_window) == self.slow_period:
             self.prev_slow_ma = self.slow_ma
-            self.slow_ma = sum(self.prices[-self.slow_period:]) / self.slow_period
+            self.slow_ma = self.slow_sum / self.slow_period
+        
+        if not self._seeded:
+            self._seeded = self.prev_fast_ma is not None and self.prev_slow_ma is not None
     
     def should_buy(self) -> bool:
         """
@@ -74,11 +96,8 @@ class TemplateStrategy(BaseStrategy):
         if self.position > 0:
             return False  # 已有持仓
         
-        if self.fast_ma is None or self.slow_ma is None:
-            return False  # 数据不足
-        
-        if self.prev_fast_ma is None or self.prev_slow_ma is None:
-            return False  # 需要前一个值来判断交叉
+        if not self._seeded:
+            return False  # 数据不足，需要前一个值来判断交叉
         
         # 金叉：快线从下方穿越慢线
         cross_up = (self.prev_fast_ma <= self.prev_slow_ma and 
@@ -97,11 +116,8 @@ class TemplateStrategy(BaseStrategy):
         if self.position <= 0:
             return False  # 无持仓
         
-        if self.fast_ma is None or self.slow_ma is None:
-            return False  # 数据不足
-        
-        if self.prev_fast_ma is None or self.prev_slow_ma is None:
-            return False  # 需要前一个值来判断交叉
+        if not self._seeded:
+            return False  # 数据不足，需要前一个值来判断交叉
         
         # 死叉：快线从上方穿越慢线
         cross_down = (self.prev_fast_ma >= self.prev_slow_ma and 
@@ -112,11 +128,15 @@ class TemplateStrategy(BaseStrategy):
     def reset(self) -> None:
         """重置策略状态"""
         super().reset()
-        self.prices = []
+        self.fast_window.clear()
+        self.slow_window.clear()
+        self.fast_sum = 0.0
+        self.slow_sum = 0.0
         self.fast_ma = None
         self.slow_ma = None
         self.prev_fast_ma = None
         self.prev_slow_ma = None
+        self._seeded = False
 
 
 # 策略元数据（用于策略发现和管理）
@@ -4,34 +4,196 @@ WebUI 后端服务
 基于FastAPI的回测系统Web界面后端。
 """
 
-import sys
 import os
+import time
+import hashlib
+import asyncio
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import asynccontextmanager
+from functools import lru_cache, partial, wraps
 from pathlib import Path
-from typing import Dict, Any, List, Optional
-from datetime import datetime
+from typing import Callable, Dict, Any, Generic, List, Optional, TypeVar
+from datetime import date, datetime
 import json
+import tempfile
 
-from fastapi import FastAPI, HTTPException, Query
+import numpy as np
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from fastapi import Depends, FastAPI, Query
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
-from fastapi.responses import HTMLResponse
+from fastapi.responses import HTMLResponse, JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel
 from starlette.requests import Request
-
-# 添加项目根目录到路径
-PROJECT_ROOT = Path(__file__).parent.parent
-sys.path.insert(0, str(PROJECT_ROOT))
-
-from backtester.engine import BacktestEngine, load_strategy, list_strategies
-from backtester.data_manager import DataManager
+from starlette.concurrency import run_in_threadpool
+from anyio import to_thread
+
+# 可选：orjson序列化（未安装时使用标准库json）
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# 可选：Brotli压缩（未安装时使用GZip）
+try:
+    from brotli_asgi import BrotliMiddleware
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+from backtester.engine import (
+    format_index, load_strategy, list_strategies, run_backtest, run_param_sweep
+)
+from backtester.data_manager import DataManager, DownloadError, NoDataError, enable_copy_on_write
 from backtester.config_manager import ConfigManager
+from webui.server import is_production, web_workers
+
+class FastJSONResponse(JSONResponse):
+    """
+    使用orjson序列化的JSON响应（可直接序列化NumPy数组/标量）
+    
+    接口直接返回此响应时跳过FastAPI的 jsonable_encoder 逐项转换；
+    未安装orjson时回退到标准JSONResponse。
+    """
+    
+    def render(self, content: Any) -> bytes:
+        if HAS_ORJSON:
+            return orjson.dumps(
+                content,
+                option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+            )
+        return super().render(content)
+
+
+# 只读接口的 Cache-Control：策略元数据在进程生命周期内不变，可直接缓存；
+# 股票/配置列表随增删变化，浏览器每次用ETag向服务端确认（未变化时返回304）
+CACHE_CONTROL_STATIC = 'public, max-age=300'
+CACHE_CONTROL_REVALIDATE = 'no-cache'
+
+
+def etag_response(request: Request, content: Any,
+                  cache_control: str = CACHE_CONTROL_REVALIDATE) -> Response:
+    """
+    生成带 ETag / Cache-Control 的JSON响应
+    
+    ETag 为响应体的 blake2b 摘要；与请求的 If-None-Match 匹配时
+    返回不带响应体的 304 Not Modified。
+    """
+    response = FastJSONResponse(content)
+    etag = '"%s"' % hashlib.blake2b(response.body, digest_size=16).hexdigest()
+    headers = {'ETag': etag, 'Cache-Control': cache_control}
+    
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match:
+        candidates = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+        if etag in candidates or '*' in candidates:
+            return Response(status_code=304, headers=headers)
+    
+    response.headers.update(headers)
+    return response
+
+
+# 权益曲线返回的最大点数
+EQUITY_CURVE_POINTS = 500
+
+# /api/data 返回的行情列
+OHLCV_COLUMNS = ('open', 'high', 'low', 'close', 'volume')
+
+# 单次批量回测的最大参数组数
+MAX_BATCH_SIZE = 200
+
+
+def lttb_indices(values: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets 降采样，返回保留点的索引
+    
+    首尾两点固定保留，其余点分为 n_out - 2 个桶，每个桶选出与前一个保留点、
+    下一个桶均值构成三角形面积最大的点，比等间隔抽样更好地保留峰谷。
+    
+    Args:
+        values: 纵坐标数组（横坐标为索引）
+        n_out: 输出点数
+    
+    Returns:
+        升序的索引数组
+    """
+    n = len(values)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    
+    y = np.asarray(values, dtype=np.float64)
+    x = np.arange(n, dtype=np.float64)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0] = 0
+    indices[-1] = n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) -
+                      (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        indices[i + 1] = a
+    return indices
+
+
+# 同步接口（文件读写、数据下载、回测计算）在线程池中执行，线程数上限
+THREADPOOL_SIZE = 100
+
+# 每个worker进程的回测计算进程数（CPU密集，绕开GIL在多核上并行）。
+# 多worker部署时各worker平分CPU核数，避免 worker数 × CPU核数 个进程争抢CPU；
+# WEBUI_BACKTEST_WORKERS 可覆盖
+BACKTEST_WORKERS = (int(os.getenv('WEBUI_BACKTEST_WORKERS', '0')) or
+                    max(1, (os.cpu_count() or 1) // web_workers()))
+
+
+@lru_cache(maxsize=None)
+def get_backtest_pool() -> ProcessPoolExecutor:
+    """获取回测进程池（首次回测时创建）"""
+    return ProcessPoolExecutor(max_workers=BACKTEST_WORKERS)
+
+
+def build_strategy_registry() -> Dict[str, Dict[str, Any]]:
+    """扫描 strategies/ 目录，返回 模块名 -> 策略元数据 的注册表"""
+    return {info['module']: info for info in list_strategies()}
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    启动时扩大AnyIO线程池、启用pandas写时复制、建立策略注册表并预编译页面模板；
+    退出时关闭回测进程池和数据下载会话
+    
+    策略注册表只在启动时构建一次，接口按模块名直接查表，
+    不再根据请求参数动态导入模块。
+    """
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    enable_copy_on_write()
+    app.state.strategy_registry = build_strategy_registry()
+    templates.get_template("index.html")
+    yield
+    if get_backtest_pool.cache_info().currsize:
+        get_backtest_pool().shutdown(cancel_futures=True)
+    if get_data_manager.cache_info().currsize:
+        get_data_manager().close()
+
 
 # 创建FastAPI应用
 app = FastAPI(
     title="PythonTradeView",
     description="策略隔离交易回测系统",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse
 )
 
 # CORS配置
@@ -43,6 +205,61 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 响应压缩：K线与权益曲线等大JSON按客户端 Accept-Encoding 自动压缩
+COMPRESS_MIN_SIZE = 1000
+if HAS_BROTLI:
+    # 客户端不支持br时自动回退到gzip
+    app.add_middleware(BrotliMiddleware, quality=4, minimum_size=COMPRESS_MIN_SIZE)
+else:
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESS_MIN_SIZE, compresslevel=5)
+
+# ============= 错误处理 =============
+
+class AppError(Exception):
+    """
+    接口业务错误
+    
+    接口中直接抛出，由统一的异常处理器转换为
+    {"success": False, "message": ...} 响应，接口内不再逐个 try/except。
+    """
+    status_code = 400
+
+
+class BadInput(AppError):
+    """请求参数无效"""
+    status_code = 400
+
+
+class NotFound(AppError):
+    """请求的资源不存在"""
+    status_code = 404
+
+
+class DownloadFailed(AppError):
+    """行情数据加载/下载失败"""
+    status_code = 502
+
+
+def error_response(message: str, status_code: int) -> FastJSONResponse:
+    """失败响应（与成功响应格式一致）"""
+    return FastJSONResponse(
+        {"success": False, "message": message, "data": None},
+        status_code=status_code
+    )
+
+
+@app.exception_handler(AppError)
+async def handle_app_error(request: Request, exc: AppError) -> FastJSONResponse:
+    """业务错误 -> 对应状态码的失败响应"""
+    return error_response(str(exc), exc.status_code)
+
+
+@app.exception_handler(Exception)
+async def handle_unexpected_error(request: Request, exc: Exception) -> FastJSONResponse:
+    """未预期的异常 -> 500失败响应（异常仍由uvicorn记录日志）"""
+    return error_response(f"服务器内部错误: {exc}", 500)
+
+
 # 静态文件和模板
 WEBUI_DIR = Path(__file__).parent
 STATIC_DIR = WEBUI_DIR / "static"
@@ -51,7 +268,249 @@ TEMPLATES_DIR = WEBUI_DIR / "templates"
 # 确保目录存在
 if STATIC_DIR.exists():
     app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+
+# 模板编译结果缓存到磁盘，各worker进程及重启后直接加载字节码；
+# 生产模式下不再检查模板文件是否修改
+JINJA_CACHE_DIR = Path(tempfile.gettempdir()) / "tradeview_jinja"
+JINJA_CACHE_DIR.mkdir(exist_ok=True)
+templates = Jinja2Templates(env=Environment(
+    loader=FileSystemLoader(str(TEMPLATES_DIR)),
+    auto_reload=not is_production(),
+    bytecode_cache=FileSystemBytecodeCache(str(JINJA_CACHE_DIR)),
+    cache_size=400,
+    autoescape=True
+))
+
+
+# ============= 共享实例与缓存 =============
+
+# 列表类接口结果的缓存时间（秒）
+CACHE_TTL = 30
+
+
+# 以下两个函数作为所有接口的依赖项（Depends），每个进程只创建一次实例；
+# 接口把注入的实例逐层传给缓存/加载函数，测试时可通过 app.dependency_overrides 替换
+@lru_cache(maxsize=None)
+def get_data_manager() -> DataManager:
+    """获取共享的DataManager实例（首次调用时创建）"""
+    return DataManager()
+
+
+@lru_cache(maxsize=None)
+def get_config_manager() -> ConfigManager:
+    """获取共享的ConfigManager实例（首次调用时创建）"""
+    return ConfigManager()
+
+
+def ttl_cache(ttl: float = CACHE_TTL, maxsize: int = 64) -> Callable:
+    """
+    带过期时间的LRU缓存装饰器
+    
+    缓存结果在 ttl 秒后失效；被装饰函数提供 cache_clear() 用于数据变更后立即失效。
+    返回值被多个请求共享，调用方不得原地修改。
+    """
+    def decorator(func: Callable) -> Callable:
+        cache: OrderedDict = OrderedDict()
+        lock = threading.Lock()
+        
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = (args, tuple(sorted(kwargs.items())))
+            now = time.monotonic()
+            with lock:
+                entry = cache.get(key)
+                if entry is not None and entry[0] > now:
+                    cache.move_to_end(key)
+                    return entry[1]
+            
+            value = func(*args, **kwargs)
+            with lock:
+                cache[key] = (now + ttl, value)
+                cache.move_to_end(key)
+                while len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return value
+        
+        def cache_clear() -> None:
+            with lock:
+                cache.clear()
+        
+        wrapper.cache_clear = cache_clear
+        return wrapper
+    return decorator
+
+
+def singleflight(func: Callable) -> Callable:
+    """
+    合并相同参数的并发调用
+    
+    同一组参数的调用正在执行时，后到的调用不再重复执行，
+    而是等待并共享第一次调用的结果（或异常）。调用结束后不保留结果。
+    """
+    inflight: Dict[Any, Future] = {}
+    lock = threading.Lock()
+    
+    @wraps(func)
+    def wrapper(*args):
+        with lock:
+            future = inflight.get(args)
+            leader = future is None
+            if leader:
+                future = inflight[args] = Future()
+        if not leader:
+            return future.result()
+        
+        try:
+            value = func(*args)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(value)
+            return value
+        finally:
+            with lock:
+                del inflight[args]
+    return wrapper
+
+
+# 以下缓存在每个worker进程内各自保存。缓存键包含数据目录/数据文件的修改时间
+# 或配置库版本号，其他worker增删数据或修改配置后，本进程的缓存随之失效。
+# 管理器实例也是缓存键的一部分，替换依赖后不会取到原实例的缓存结果。
+
+@ttl_cache()
+def _cached_symbols(dm: DataManager, version: int) -> List[str]:
+    """按数据目录版本缓存的股票代码列表"""
+    return dm.list_available_symbols()
+
+
+def cached_symbols(dm: DataManager) -> List[str]:
+    """可用股票代码列表"""
+    return _cached_symbols(dm, dm.data_dir_version())
+
+
+@ttl_cache()
+def _cached_local_data(dm: DataManager, version: int) -> List[Dict[str, Any]]:
+    """按数据目录版本缓存的本地数据详情"""
+    return dm.list_local_data()
+
+
+def cached_local_data(dm: DataManager) -> List[Dict[str, Any]]:
+    """本地数据详情"""
+    return _cached_local_data(dm, dm.data_dir_version())
+
+
+@ttl_cache()
+def _cached_configs(cm: ConfigManager, strategy: Optional[str], symbol: Optional[str],
+                    version: int) -> List[Dict[str, Any]]:
+    """按配置库版本缓存的配置列表"""
+    return cm.list_configs(strategy=strategy, symbol=symbol)
+
+
+def cached_configs(cm: ConfigManager, strategy: Optional[str],
+                   symbol: Optional[str]) -> List[Dict[str, Any]]:
+    """配置列表"""
+    return _cached_configs(cm, strategy, symbol, cm.data_version())
+
+
+@lru_cache(maxsize=64)
+def _cached_window(dm: DataManager, symbol: str, start: Optional[str], end: Optional[str],
+                   today: date, version: Optional[int]):
+    """
+    按 (symbol, start, end, 当天日期, 数据文件修改时间) 缓存的行情切片
+    
+    未指定日期时默认范围随日期变化；数据文件被重新下载或删除后修改时间改变。
+    """
+    return dm.get_data(symbol, start, end)
+
+
+@singleflight
+def _load_window(dm: DataManager, symbol: str, start: Optional[str], end: Optional[str],
+                 today: date, version: Optional[int]):
+    """同一区间的并发请求只读取/下载一次数据"""
+    return _cached_window(dm, symbol, start, end, today, version)
+
+
+def get_stock_window(dm: DataManager, symbol: str, start: Optional[str] = None,
+                     end: Optional[str] = None):
+    """
+    获取行情数据，重复请求同一区间时直接返回缓存
+    
+    DataManager 已把每只股票的完整历史保存为本地Parquet并缓存在内存中，
+    这里再缓存按区间切好的结果，回测调参时反复请求同一窗口不再重复筛选。
+    返回的DataFrame被多个请求共享，调用方不得原地修改。
+    """
+    symbol = symbol.upper()
+    return _load_window(dm, symbol, start, end, date.today(), dm.local_version(symbol))
+
+
+def parse_date_param(value: Optional[str], name: str) -> Optional[str]:
+    """校验 YYYY-MM-DD 格式的日期参数，格式错误时抛出 BadInput"""
+    if value is None:
+        return None
+    try:
+        return date.fromisoformat(value).isoformat()
+    except ValueError:
+        raise BadInput(f"{name} 日期格式错误，应为 YYYY-MM-DD: {value}") from None
+
+
+def parse_date_range(start: Optional[str], end: Optional[str]):
+    """校验起止日期参数，返回规范化后的 (start, end)"""
+    start = parse_date_param(start, 'start')
+    end = parse_date_param(end, 'end')
+    if start is not None and end is not None and start > end:
+        raise BadInput(f"开始日期 {start} 晚于结束日期 {end}")
+    return start, end
+
+
+def load_window(dm: DataManager, symbol: str, start: Optional[str] = None,
+                end: Optional[str] = None):
+    """
+    获取行情数据
+    
+    日期格式错误时抛出 BadInput，区间内无数据时抛出 NotFound，
+    下载失败时抛出 DownloadFailed。
+    """
+    start, end = parse_date_range(start, end)
+    try:
+        return get_stock_window(dm, symbol, start, end)
+    except DownloadError as e:
+        raise DownloadFailed(f"数据加载失败: {e}") from e
+    except NoDataError as e:
+        raise NotFound(str(e)) from e
+
+
+def require_strategy(strategy: str, params: Optional[Dict[str, Any]]) -> None:
+    """
+    校验策略存在且可加载
+    
+    只接受启动时注册表中的策略模块名，未知名称直接抛出 NotFound，
+    不会按请求参数导入任意模块；加载失败时抛出 BadInput。
+    """
+    if strategy not in app.state.strategy_registry:
+        raise NotFound(f"策略不存在: {strategy}")
+    try:
+        load_strategy(strategy, params)
+    except (ImportError, ValueError) as e:
+        raise BadInput(f"策略加载失败: {e}") from e
+
+
+@singleflight
+def download_symbol(dm: DataManager, symbol: str, start: Optional[str],
+                    end: Optional[str]) -> Dict[str, Any]:
+    """
+    下载股票数据
+    
+    多个客户端同时添加同一股票时只下载一次，避免重复请求和并发写同一数据文件。
+    """
+    return dm.add_symbol(symbol, start, end)
+
+
+def invalidate_symbol_caches() -> None:
+    """股票数据增删后清除相关缓存"""
+    _cached_symbols.cache_clear()
+    _cached_local_data.cache_clear()
+    _cached_window.cache_clear()
 
 
 # ============= Pydantic 模型 =============
@@ -66,6 +525,16 @@ class BacktestRequest(BaseModel):
     params: Optional[Dict[str, Any]] = None
 
 
+class BatchBacktestRequest(BaseModel):
+    """批量回测请求：同一策略/股票/区间下的多组参数"""
+    strategy: str
+    symbol: str
+    start_date: Optional[str] = None
+    end_date: Optional[str] = None
+    initial_capital: float = 100000.0
+    param_grid: List[Dict[str, Any]]
+
+
 class AddSymbolRequest(BaseModel):
     """添加股票请求"""
     symbol: str
@@ -88,440 +557,404 @@ class ImportConfigRequest(BaseModel):
     json_data: str
 
 
+T = TypeVar('T')
+
+
+class ApiResponse(BaseModel, Generic[T]):
+    """
+    统一的接口响应格式
+    
+    作为 response_model 主要用于在OpenAPI文档中描述响应结构。
+    返回 etag_response / FastJSONResponse 的接口（列表、行情、回测等大响应）
+    跳过 response_model，直接由orjson序列化；只有返回字典的小接口
+    （增删改配置/股票）才按此模型校验并序列化。
+    """
+    success: bool
+    message: Optional[str] = None
+    data: Optional[T] = None
+
+
+class HealthResponse(BaseModel):
+    """健康检查响应"""
+    status: str
+    timestamp: str
+    version: str
+
+
+# 各接口的响应模型（用于接口文档）
+RecordList = ApiResponse[List[Dict[str, Any]]]
+SymbolList = ApiResponse[List[str]]
+RecordData = ApiResponse[Dict[str, Any]]
+
+
 # ============= 页面路由 =============
 
 @app.get("/", response_class=HTMLResponse)
 async def index(request: Request):
     """主页"""
-    return templates.TemplateResponse("index.html", {"request": request})
+    return templates.TemplateResponse(request, "index.html")
 
 
 # ============= API 路由 =============
 
-@app.get("/api/strategies")
-async def get_strategies() -> Dict[str, Any]:
+@app.get("/api/strategies", response_model=RecordList)
+async def get_strategies(request: Request) -> Response:
     """获取所有可用策略"""
-    try:
-        strategies = list_strategies()
-        return {
-            "success": True,
-            "data": strategies
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "message": str(e),
-            "data": []
-        }
+    strategies = list(app.state.strategy_registry.values())
+    return etag_response(request, {
+        "success": True,
+        "data": strategies
+    }, CACHE_CONTROL_STATIC)
 
 
-@app.get("/api/symbols")
-async def get_symbols() -> Dict[str, Any]:
+@app.get("/api/symbols", response_model=SymbolList)
+def get_symbols(request: Request, dm: DataManager = Depends(get_data_manager)) -> Response:
     """获取可用的股票代码列表（包括推荐的热门股票）"""
-    try:
-        dm = DataManager()
-        symbols = dm.list_available_symbols()
-        return {
-            "success": True,
-            "data": symbols
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "message": str(e),
-            "data": []
-        }
+    symbols = cached_symbols(dm)
+    return etag_response(request, {
+        "success": True,
+        "data": symbols
+    })
 
 
-@app.get("/api/symbols/local")
-async def get_local_symbols() -> Dict[str, Any]:
+@app.get("/api/symbols/local", response_model=RecordList)
+def get_local_symbols(request: Request, dm: DataManager = Depends(get_data_manager)) -> Response:
     """获取本地已下载的股票数据详情"""
-    try:
-        dm = DataManager()
-        data = dm.list_local_data()
-        return {
-            "success": True,
-            "data": data
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "message": str(e),
-            "data": []
-        }
+    data = cached_local_data(dm)
+    return etag_response(request, {
+        "success": True,
+        "data": data
+    })
 
 
-@app.post("/api/symbols/add")
-async def add_symbol(request: AddSymbolRequest) -> Dict[str, Any]:
+@app.post("/api/symbols/add", response_model=RecordData)
+def add_symbol(request: AddSymbolRequest,
+               dm: DataManager = Depends(get_data_manager)) -> Dict[str, Any]:
     """添加/下载新股票数据"""
-    try:
-        dm = DataManager()
-        result = dm.add_symbol(
-            request.symbol,
-            request.start_date,
-            request.end_date
-        )
-        
-        if result['success']:
-            return {
-                "success": True,
-                "message": f"成功下载 {result['symbol']} 数据，共 {result['records']} 条",
-                "data": result
-            }
-        else:
-            return {
-                "success": False,
-                "message": result.get('error', '下载失败'),
-                "data": None
-            }
-    except Exception as e:
-        return {
-            "success": False,
-            "message": str(e),
-            "data": None
-        }
+    start, end = parse_date_range(request.start_date, request.end_date)
+    result = download_symbol(dm, request.symbol.upper(), start, end)
+    invalidate_symbol_caches()
+    
+    if not result['success']:
+        raise DownloadFailed(result.get('error', '下载失败'))
+    return {
+        "success": True,
+        "message": f"成功下载 {result['symbol']} 数据，共 {result['records']} 条",
+        "data": result
+    }
 
 
-@app.delete("/api/symbols/{symbol}")
-async def delete_symbol(symbol: str) -> Dict[str, Any]:
+@app.delete("/api/symbols/{symbol}", response_model=ApiResponse)
+def delete_symbol(symbol: str, dm: DataManager = Depends(get_data_manager)) -> Dict[str, Any]:
     """删除股票数据"""
-    try:
-        dm = DataManager()
-        success = dm.delete_symbol(symbol)
-        
-        if success:
-            return {
-                "success": True,
-                "message": f"已删除 {symbol} 的数据"
-            }
-        else:
-            return {
-                "success": False,
-                "message": f"{symbol} 数据不存在"
-            }
-    except Exception as e:
-        return {
-            "success": False,
-            "message": str(e)
-        }
+    success = dm.delete_symbol(symbol)
+    invalidate_symbol_caches()
+    
+    if not success:
+        raise NotFound(f"{symbol} 数据不存在")
+    return {
+        "success": True,
+        "message": f"已删除 {symbol} 的数据"
+    }
 
 
-@app.get("/api/strategy/{strategy_name}")
-async def get_strategy_detail(strategy_name: str) -> Dict[str, Any]:
+@app.get("/api/strategy/{strategy_name}", response_model=RecordData)
+async def get_strategy_detail(strategy_name: str, request: Request) -> Response:
     """获取策略详情"""
-    try:
-        import importlib
-        module = importlib.import_module(f'strategies.{strategy_name}')
-        metadata = getattr(module, 'STRATEGY_METADATA', {})
-        
-        return {
-            "success": True,
-            "data": {
-                "module": strategy_name,
-                **metadata
-            }
-        }
-    except Exception as e:
-        raise HTTPException(status_code=404, detail=f"策略不存在: {e}")
+    metadata = app.state.strategy_registry.get(strategy_name)
+    if metadata is None:
+        raise NotFound(f"策略不存在: {strategy_name}")
+    
+    return etag_response(request, {
+        "success": True,
+        "data": metadata
+    }, CACHE_CONTROL_STATIC)
 
 
 # ============= 配置管理 API =============
 
-@app.get("/api/configs")
-async def list_configs(
+@app.get("/api/configs", response_model=RecordList)
+def list_configs(
+    request: Request,
     strategy: Optional[str] = None,
-    symbol: Optional[str] = None
-) -> Dict[str, Any]:
+    symbol: Optional[str] = None,
+    cm: ConfigManager = Depends(get_config_manager)
+) -> Response:
     """获取配置列表"""
-    try:
-        cm = ConfigManager()
-        configs = cm.list_configs(strategy=strategy, symbol=symbol)
-        return {
-            "success": True,
-            "data": configs
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "message": str(e),
-            "data": []
-        }
+    configs = cached_configs(cm, strategy, symbol)
+    return etag_response(request, {
+        "success": True,
+        "data": configs
+    })
 
 
-@app.get("/api/configs/{config_id}")
-async def get_config(config_id: str) -> Dict[str, Any]:
+@app.get("/api/configs/{config_id}", response_model=RecordData)
+def get_config(config_id: str, cm: ConfigManager = Depends(get_config_manager)) -> Dict[str, Any]:
     """获取指定配置"""
-    try:
-        cm = ConfigManager()
-        config = cm.get_config(config_id)
-        
-        if config:
-            return {
-                "success": True,
-                "data": config
-            }
-        else:
-            return {
-                "success": False,
-                "message": "配置不存在",
-                "data": None
-            }
-    except Exception as e:
-        return {
-            "success": False,
-            "message": str(e),
-            "data": None
-        }
+    config = cm.get_config(config_id)
+    
+    if not config:
+        raise NotFound("配置不存在")
+    return {
+        "success": True,
+        "data": config
+    }
 
 
-@app.post("/api/configs")
-async def save_config(request: SaveConfigRequest) -> Dict[str, Any]:
+@app.post("/api/configs", response_model=RecordData)
+def save_config(request: SaveConfigRequest,
+                cm: ConfigManager = Depends(get_config_manager)) -> Dict[str, Any]:
     """保存配置"""
-    try:
-        cm = ConfigManager()
-        config = cm.save_config(
-            strategy=request.strategy,
-            params=request.params,
-            name=request.name,
-            symbol=request.symbol,
-            config_id=request.config_id,
-            description=request.description
-        )
-        
-        return {
-            "success": True,
-            "message": "配置已保存",
-            "data": config
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "message": str(e),
-            "data": None
-        }
+    config = cm.save_config(
+        strategy=request.strategy,
+        params=request.params,
+        name=request.name,
+        symbol=request.symbol,
+        config_id=request.config_id,
+        description=request.description
+    )
+    _cached_configs.cache_clear()
+    
+    return {
+        "success": True,
+        "message": "配置已保存",
+        "data": config
+    }
 
 
-@app.delete("/api/configs/{config_id}")
-async def delete_config(config_id: str) -> Dict[str, Any]:
+@app.delete("/api/configs/{config_id}", response_model=ApiResponse)
+def delete_config(config_id: str, cm: ConfigManager = Depends(get_config_manager)) -> Dict[str, Any]:
     """删除配置"""
-    try:
-        cm = ConfigManager()
-        success = cm.delete_config(config_id)
-        
-        if success:
-            return {
-                "success": True,
-                "message": "配置已删除"
-            }
-        else:
-            return {
-                "success": False,
-                "message": "配置不存在"
-            }
-    except Exception as e:
-        return {
-            "success": False,
-            "message": str(e)
-        }
+    success = cm.delete_config(config_id)
+    _cached_configs.cache_clear()
+    
+    if not success:
+        raise NotFound("配置不存在")
+    return {
+        "success": True,
+        "message": "配置已删除"
+    }
 
 
-@app.post("/api/configs/{config_id}/duplicate")
-async def duplicate_config(config_id: str, new_name: Optional[str] = None) -> Dict[str, Any]:
+@app.post("/api/configs/{config_id}/duplicate", response_model=RecordData)
+def duplicate_config(
+    config_id: str,
+    new_name: Optional[str] = None,
+    cm: ConfigManager = Depends(get_config_manager)
+) -> Dict[str, Any]:
     """复制配置"""
-    try:
-        cm = ConfigManager()
-        config = cm.duplicate_config(config_id, new_name)
-        
-        if config:
-            return {
-                "success": True,
-                "message": "配置已复制",
-                "data": config
-            }
-        else:
-            return {
-                "success": False,
-                "message": "原配置不存在"
-            }
-    except Exception as e:
-        return {
-            "success": False,
-            "message": str(e)
-        }
+    config = cm.duplicate_config(config_id, new_name)
+    _cached_configs.cache_clear()
+    
+    if not config:
+        raise NotFound("原配置不存在")
+    return {
+        "success": True,
+        "message": "配置已复制",
+        "data": config
+    }
 
 
-@app.get("/api/configs/{config_id}/export")
-async def export_config(config_id: str) -> Dict[str, Any]:
+@app.get("/api/configs/{config_id}/export", response_model=ApiResponse[str])
+def export_config(config_id: str, cm: ConfigManager = Depends(get_config_manager)) -> Dict[str, Any]:
     """导出配置"""
-    try:
-        cm = ConfigManager()
-        json_str = cm.export_config(config_id)
-        
-        if json_str:
-            return {
-                "success": True,
-                "data": json_str
-            }
-        else:
-            return {
-                "success": False,
-                "message": "配置不存在"
-            }
-    except Exception as e:
-        return {
-            "success": False,
-            "message": str(e)
-        }
+    json_str = cm.export_config(config_id)
+    
+    if not json_str:
+        raise NotFound("配置不存在")
+    return {
+        "success": True,
+        "data": json_str
+    }
 
 
-@app.post("/api/configs/import")
-async def import_config(request: ImportConfigRequest) -> Dict[str, Any]:
+@app.post("/api/configs/import", response_model=RecordData)
+def import_config(request: ImportConfigRequest,
+                  cm: ConfigManager = Depends(get_config_manager)) -> Dict[str, Any]:
     """导入配置"""
-    try:
-        cm = ConfigManager()
-        config = cm.import_config(request.json_data)
-        
-        if config:
-            return {
-                "success": True,
-                "message": "配置已导入",
-                "data": config
-            }
-        else:
-            return {
-                "success": False,
-                "message": "导入失败，请检查JSON格式"
-            }
-    except Exception as e:
-        return {
-            "success": False,
-            "message": str(e)
-        }
+    config = cm.import_config(request.json_data)
+    _cached_configs.cache_clear()
+    
+    if not config:
+        raise BadInput("导入失败，请检查JSON格式")
+    return {
+        "success": True,
+        "message": "配置已导入",
+        "data": config
+    }
 
 
 # ============= 回测 API =============
 
-@app.post("/api/backtest")
-async def run_backtest_api(request: BacktestRequest) -> Dict[str, Any]:
-    """运行回测"""
-    try:
-        # 验证策略存在
-        try:
-            strategy = load_strategy(request.strategy, request.params)
-        except ImportError as e:
-            return {
-                "success": False,
-                "message": f"策略加载失败: {e}",
-                "data": None
-            }
-        
-        # 加载数据（自动下载如果不存在）
-        dm = DataManager()
-        try:
-            data = dm.get_data(
-                request.symbol, 
-                request.start_date, 
-                request.end_date
-            )
-        except Exception as e:
-            return {
-                "success": False,
-                "message": f"数据加载失败: {e}",
-                "data": None
-            }
-        
-        # 运行回测
-        engine = BacktestEngine(strategy, data, request.initial_capital)
-        results = engine.run(verbose=False)
-        
-        # 简化权益曲线数据（采样以减少数据量）
-        equity_curve = results.get('equity_curve', [])
-        if len(equity_curve) > 500:
-            step = len(equity_curve) // 500
-            equity_curve = equity_curve[::step]
-        results['equity_curve'] = equity_curve
-        
-        return {
-            "success": True,
-            "message": "回测完成",
-            "data": results
-        }
-        
-    except Exception as e:
-        import traceback
-        return {
-            "success": False,
-            "message": f"回测执行错误: {e}",
-            "data": None
-        }
+def _downsample_equity_curve(results: Dict[str, Any]) -> None:
+    """简化权益曲线数据（LTTB降采样，保留峰谷）"""
+    equity_curve = results.get('equity_curve', [])
+    if len(equity_curve) > EQUITY_CURVE_POINTS:
+        values = np.fromiter((point['value'] for point in equity_curve),
+                             dtype=np.float64, count=len(equity_curve))
+        equity_curve = [equity_curve[i] for i in lttb_indices(values, EQUITY_CURVE_POINTS).tolist()]
+    results['equity_curve'] = equity_curve
+
+
+def _submit_backtest(strategy: str, symbol: str, params: Optional[Dict[str, Any]],
+                     initial_capital: float, data) -> asyncio.Future:
+    """把一次回测提交到进程池，返回可等待的Future"""
+    return asyncio.get_running_loop().run_in_executor(
+        get_backtest_pool(),
+        partial(
+            run_backtest,
+            strategy,
+            symbol,
+            params=params,
+            initial_capital=initial_capital,
+            verbose=False,
+            data=data
+        )
+    )
 
 
-@app.get("/api/data/{symbol}")
-async def get_stock_data(
+@app.post("/api/backtest", response_model=RecordData)
+async def run_backtest_api(request: BacktestRequest,
+                           dm: DataManager = Depends(get_data_manager)) -> FastJSONResponse:
+    """
+    运行回测
+    
+    策略校验与数据加载在线程池中执行，回测计算提交到进程池，
+    事件循环在回测期间可继续处理其他请求。
+    """
+    # 验证策略存在
+    await run_in_threadpool(require_strategy, request.strategy, request.params)
+    
+    # 加载数据（自动下载如果不存在）
+    data = await run_in_threadpool(
+        load_window,
+        dm,
+        request.symbol, 
+        request.start_date, 
+        request.end_date
+    )
+    
+    # 在进程池中运行回测（数据随任务传给工作进程）
+    results = await _submit_backtest(
+        request.strategy, request.symbol, request.params, request.initial_capital, data
+    )
+    _downsample_equity_curve(results)
+    
+    # 直接返回响应，大结果不经过 jsonable_encoder
+    return FastJSONResponse({
+        "success": True,
+        "message": "回测完成",
+        "data": results
+    })
+
+
+@app.post("/api/backtest/batch", response_model=RecordList)
+async def run_backtest_batch_api(request: BatchBacktestRequest,
+                                 dm: DataManager = Depends(get_data_manager)) -> FastJSONResponse:
+    """
+    批量回测（参数扫描）
+    
+    策略与数据只加载一次。参数按进程池大小分组，每组作为一个任务提交，
+    数据每组只传给工作进程一次，而不是每组参数各传一份。
+    返回与 param_grid 顺序一致的结果列表，单组失败不影响其他组。
+    """
+    if not request.param_grid:
+        raise BadInput("param_grid 不能为空")
+    if len(request.param_grid) > MAX_BATCH_SIZE:
+        raise BadInput(f"单次最多 {MAX_BATCH_SIZE} 组参数")
+    
+    await run_in_threadpool(require_strategy, request.strategy, request.param_grid[0])
+    data = await run_in_threadpool(
+        load_window, dm, request.symbol, request.start_date, request.end_date
+    )
+    
+    # 按工作进程数把参数切成连续的几段
+    param_grid = request.param_grid
+    n_chunks = min(BACKTEST_WORKERS, len(param_grid))
+    size = -(-len(param_grid) // n_chunks)
+    chunks = [param_grid[i:i + size] for i in range(0, len(param_grid), size)]
+    
+    loop = asyncio.get_running_loop()
+    chunk_outcomes = await asyncio.gather(*(
+        loop.run_in_executor(
+            get_backtest_pool(),
+            partial(run_param_sweep, request.strategy, request.symbol, data,
+                    chunk, request.initial_capital)
+        )
+        for chunk in chunks
+    ))
+    
+    runs = []
+    outcomes = (outcome for chunk in chunk_outcomes for outcome in chunk)
+    for params, (ok, outcome) in zip(param_grid, outcomes):
+        if not ok:
+            runs.append({"params": params, "success": False,
+                         "message": f"回测执行错误: {outcome}", "data": None})
+        else:
+            _downsample_equity_curve(outcome)
+            runs.append({"params": params, "success": True, "message": "回测完成", "data": outcome})
+    
+    return FastJSONResponse({
+        "success": True,
+        "message": f"批量回测完成，共 {len(runs)} 组",
+        "data": runs
+    })
+
+
+@app.get("/api/data/{symbol}", response_model=RecordData)
+def get_stock_data(
     symbol: str,
+    request: Request,
     start: Optional[str] = None,
-    end: Optional[str] = None
-) -> Dict[str, Any]:
+    end: Optional[str] = None,
+    dm: DataManager = Depends(get_data_manager)
+) -> Response:
     """获取股票数据（自动下载如果不存在）"""
-    try:
-        dm = DataManager()
-        data = dm.get_data(symbol, start, end)
-        
-        # 转换为JSON友好格式
-        records = []
-        for idx, row in data.iterrows():
-            records.append({
-                "date": idx.isoformat() if hasattr(idx, 'isoformat') else str(idx),
-                "open": float(row['open']),
-                "high": float(row['high']),
-                "low": float(row['low']),
-                "close": float(row['close']),
-                "volume": float(row.get('volume', 0))
-            })
-        
-        # 采样以减少数据量
-        if len(records) > 1000:
-            step = len(records) // 1000
-            records = records[::step]
-        
-        return {
-            "success": True,
-            "data": {
-                "symbol": symbol.upper(),
-                "records": records,
-                "count": len(records)
-            }
-        }
-    except Exception as e:
-        return {
-            "success": False,
-            "message": str(e),
-            "data": None
+    data = load_window(dm, symbol, start, end)
+    
+    # 先采样以减少数据量，只转换实际返回的行
+    if len(data) > 1000:
+        step = len(data) // 1000
+        data = data.iloc[::step]
+    
+    # 缺少成交量列时一次性补0，之后各列统一处理
+    if 'volume' not in data.columns:
+        data = data.assign(volume=0.0)
+    
+    # OHLCV一次转换为二维float64数组，再整体转为Python行列表
+    dates = format_index(data.index)
+    rows = data[list(OHLCV_COLUMNS)].to_numpy(dtype=np.float64).tolist()
+    records = [
+        {"date": date, "open": o, "high": h, "low": l, "close": c, "volume": v}
+        for date, (o, h, l, c, v) in zip(dates, rows)
+    ]
+    
+    return etag_response(request, {
+        "success": True,
+        "data": {
+            "symbol": symbol.upper(),
+            "records": records,
+            "count": len(records)
         }
+    })
 
 
-@app.get("/api/health")
-async def health_check():
+@app.get("/api/health", response_model=HealthResponse)
+async def health_check() -> HealthResponse:
     """健康检查"""
-    return {
-        "status": "healthy",
-        "timestamp": datetime.now().isoformat(),
-        "version": "1.0.0"
-    }
+    return HealthResponse(
+        status="healthy",
+        timestamp=datetime.now().isoformat(),
+        version="1.0.0"
+    )
 
 
 # ============= 主入口 =============
 
 def main():
-    """启动开发服务器"""
-    import uvicorn
-    uvicorn.run(
-        "app:app",
-        host="0.0.0.0",
-        port=8000,
-        reload=True,
-        reload_dirs=[str(PROJECT_ROOT)]
-    )
+    """启动服务器（WEBUI_ENV=production 时为多worker生产模式，见 webui/server.py）"""
+    from webui.server import serve
+    serve("webui.app:app")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,21 @@
+"""
+Gunicorn 生产部署配置
+
+用法（在项目根目录）:
+    gunicorn -c webui/gunicorn.conf.py webui.app:app
+"""
+
+import os
+
+from webui.server import HOST, PORT, default_workers
+
+# 生产模式，使回测进程池按worker数平分CPU核数（见 webui/app.py BACKTEST_WORKERS）
+os.environ.setdefault('WEBUI_ENV', 'production')
+
+bind = f"{HOST}:{PORT}"
+workers = default_workers()
+worker_class = 'uvicorn.workers.UvicornWorker'
+
+# 回测等长请求可能持续较久
+timeout = 120
+keepalive = 5
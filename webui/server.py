@@ -0,0 +1,79 @@
+"""
+WebUI 服务启动参数
+
+开发模式（默认）：单进程 + 代码热重载（WEBUI_RELOAD=0 可关闭）；
+生产模式（WEBUI_ENV=production）：关闭热重载，启动多个worker进程。
+各worker的内存缓存以数据文件修改时间/配置库版本为键，其他worker修改数据后自动失效。
+热重载只监视源码文件，行情数据/配置库等运行时写入不会触发重启。
+已安装 uvloop / httptools 时使用其替代 asyncio 事件循环和 h11 解析器。
+"""
+
+import os
+from importlib.util import find_spec
+from pathlib import Path
+from typing import Any, Dict
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+HOST = os.getenv('WEBUI_HOST', '0.0.0.0')
+PORT = int(os.getenv('WEBUI_PORT', '8000'))
+
+# 热重载监视的文件与排除的路径（需安装 watchfiles 才生效，否则只监视 *.py）
+RELOAD_INCLUDES = ['*.py']
+RELOAD_EXCLUDES = [
+    '.git/*', '*/__pycache__/*', '*/data/*', '*/cache/*',
+    '*.parquet', '*.csv', '*.db', '*.db-wal', '*.db-shm',
+]
+
+
+def is_production() -> bool:
+    """是否以生产模式运行"""
+    return os.getenv('WEBUI_ENV', 'development').lower() == 'production'
+
+
+def reload_enabled() -> bool:
+    """开发模式下是否启用热重载"""
+    return not is_production() and os.getenv('WEBUI_RELOAD', '1') == '1'
+
+
+def default_workers() -> int:
+    """
+    生产模式的worker进程数，默认为CPU核数的一半（WEBUI_WORKERS可覆盖）
+    
+    回测计算在各worker的进程池中执行，worker只处理请求，无需按CPU核数成倍启动。
+    """
+    return int(os.getenv('WEBUI_WORKERS', '0')) or max(1, (os.cpu_count() or 1) // 2)
+
+
+def web_workers() -> int:
+    """当前部署方式下的worker进程数（开发模式为1）"""
+    return default_workers() if is_production() else 1
+
+
+def uvicorn_options() -> Dict[str, Any]:
+    """uvicorn.run 的启动参数（热重载与多worker互斥）"""
+    options: Dict[str, Any] = {
+        'host': HOST,
+        'port': PORT,
+        'loop': 'uvloop' if find_spec('uvloop') else 'asyncio',
+        'http': 'httptools' if find_spec('httptools') else 'h11',
+    }
+    if reload_enabled():
+        options['reload'] = True
+        options['reload_dirs'] = [str(PROJECT_ROOT)]
+        options['reload_includes'] = RELOAD_INCLUDES
+        options['reload_excludes'] = RELOAD_EXCLUDES
+    elif is_production():
+        options['workers'] = default_workers()
+    return options
+
+
+def serve(app_path: str) -> None:
+    """
+    启动WebUI服务
+
+    Args:
+        app_path: 应用导入路径，如 "webui.app:app"
+    """
+    import uvicorn
+    uvicorn.run(app_path, **uvicorn_options())